@@ -0,0 +1,66 @@
+"""Micro-benchmark: listing page extraction, BeautifulSoup tree vs. grid_items.
+
+Run from the project root:
+
+    python bench/bench_extract.py [saved_page.html ...]
+
+Without arguments every page in bench/fixtures is used.
+"""
+
+import sys
+from glob import glob
+from os import path
+from timeit import repeat
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from hammerpy.artsy import grid_items  # pylint: disable=wrong-import-position
+
+FIXTURES = path.join(path.dirname(path.abspath(__file__)), "fixtures")
+
+
+def grid_items_soup(html: str) -> list[tuple[str, str, str]]:
+    """The extraction scrape_artsy used to do: a full html.parser tree plus findNext walks."""
+
+    soup = BeautifulSoup(html, "html.parser")
+    items = []
+    for div in soup.find_all("div", attrs={"data-test": "artworkGridItem"}):
+        price = div.find_next("div", attrs={"font-weight": "bold"})
+        img_tag = div.find_next("img")
+        if not price or not img_tag or not img_tag.get("src"):
+            continue
+        items.append((price.text, img_tag.get("src"), img_tag.get("alt", "")))
+
+    return items
+
+
+def best_of(fn, html: str, number: int) -> float:
+    """Best average seconds per call over a few rounds."""
+
+    return min(repeat(lambda: fn(html), number=number, repeat=5)) / number
+
+
+def main(pages: list[str]):
+    """Check both extractors agree on every page, then time them."""
+
+    print(f"{'page':<32}{'items':>6}{'soup ms':>10}{'grid ms':>10}{'speedup':>9}")
+    for page in pages:
+        with open(page, encoding="utf8") as file:
+            html = file.read()
+
+        expected = grid_items_soup(html)
+        if grid_items(html) != expected:
+            sys.exit(f"{page}: grid_items output differs from BeautifulSoup")
+
+        soup_s = best_of(grid_items_soup, html, 3)
+        grid_s = best_of(grid_items, html, 10)
+        print(
+            f"{path.basename(page):<32}{len(expected):>6}"
+            f"{soup_s * 1000:>10.2f}{grid_s * 1000:>10.2f}{soup_s / grid_s:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or sorted(glob(path.join(FIXTURES, "*.html"))))
@@ -0,0 +1,303 @@
+"""Offline benchmark of the scraping pipeline against local stand-ins for every site.
+
+Run from the project root:
+
+    python bench/bench_offline.py [--latency MS] [--rounds N] [--save-baseline]
+
+A local HTTP server replays the recorded fixtures in bench/fixtures: Artsy listing
+pages, image bytes for the CDNs, the usd.json currency table and Algolia `queries`
+responses. Every request the game makes is routed to it, whatever the host. Each stage
+is reported with latency percentiles, throughput and the peak of the Python heap, and
+compared to bench/baseline.json.
+
+The heap is traced by tracemalloc, which doesn't see Pillow's pixel buffers or the
+image worker processes, so the image stages report little of what they use. The peak
+RSS at the end does include the buffers of this process.
+"""
+
+import sys
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dump, dumps, load, loads
+from os import chdir, path
+from queue import Queue
+from resource import RUSAGE_SELF, getrusage
+from shutil import copyfile, rmtree
+from statistics import quantiles
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter, sleep
+from tracemalloc import get_traced_memory, reset_peak, start, stop
+from urllib.parse import urlsplit
+
+from aiohttp import ClientRequest, ClientSession
+from requests.adapters import HTTPAdapter
+from yarl import URL
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# every cache the game keeps is relative to the working directory, and some are read
+# as soon as their module is imported, so move to a scratch directory first. Every run
+# starts cold and never touches the player's own caches. Worker processes inherit it.
+if __name__ == "__main__":
+    SCRATCH = TemporaryDirectory(prefix="hammerpy-bench-")
+    chdir(SCRATCH.name)
+
+# pylint: disable=wrong-import-position
+from hammerpy import aio, net
+from hammerpy.algolia import ALGOLIA_URL, client
+from hammerpy.artsy import scrape_artsy
+from hammerpy.imagecache import image_cache
+from hammerpy.imaging import images, prepare, renditions
+from hammerpy.sothebys import scrape_sothebys
+from hammerpy.util import Scraper
+
+FIXTURES = path.join(ROOT, "bench", "fixtures")
+BASELINE = path.join(ROOT, "bench", "baseline.json")
+
+# height of the guess view in the game window
+DISP_HEIGHT = 520
+
+
+def fixture(name: str) -> bytes:
+    """Raw bytes of a recorded fixture."""
+
+    with open(path.join(FIXTURES, name), "rb") as file:
+        return file.read()
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Answers for every site, dispatching on the original host in the first path segment."""
+
+    latency = 0.0  # seconds added to every response, like a network round trip
+    listing = fixture("artsy_listing.html")
+    image = fixture("work.jpg")
+    rates = fixture("usd.json")
+    algolia = loads(fixture("algolia_queries.json"))
+
+    def _reply(self, body: bytes, content_type: str):
+        sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Listing pages, images and the currency table."""
+
+        host, _, rest = self.path.lstrip("/").partition("/")
+        rest = rest.split("?")[0]
+        if rest.endswith(".jpg"):
+            self._reply(self.image, "image/jpeg")
+        elif host.endswith("artsy.net"):
+            self._reply(self.listing, "text/html; charset=utf-8")
+        elif rest.endswith("usd.json"):
+            self._reply(self.rates, "application/json")
+        else:
+            self.send_error(404)
+
+    do_HEAD = do_GET
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Algolia multi-query searches, one recorded result per query."""
+
+        body = loads(self.rfile.read(int(self.headers["Content-Length"])))
+        results = [self.algolia["results"][0] for _ in body["requests"]]
+        self._reply(dumps({"results": results}).encode("utf8"), "application/json")
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class StandInAdapter(HTTPAdapter):
+    """Sends every request to the stand-in server, keeping the original host in the path."""
+
+    server = ""
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        url = urlsplit(request.url)
+        query = f"?{url.query}" if url.query else ""
+        request.url = f"{self.server}/{url.netloc}{url.path}{query}"
+        return super().send(request, *args, **kwargs)
+
+
+class StandInRequest(ClientRequest):
+    """The asyncio engine's StandInAdapter."""
+
+    server = ""
+
+    def __init__(self, method: str, url: URL, *args, **kwargs):
+        url = URL(f"{self.server}/{url.host}{url.raw_path_qs}", encoded=True)
+        super().__init__(method, url, *args, **kwargs)
+
+
+def percentiles(samples: list[float]) -> tuple[float, float, float]:
+    """p50, p90 and p99 of a list of seconds, in milliseconds."""
+
+    if len(samples) == 1:
+        return (samples[0] * 1000,) * 3
+    cuts = quantiles(samples, n=100, method="inclusive")
+    return (cuts[49] * 1000, cuts[89] * 1000, cuts[98] * 1000)
+
+
+def run_stage(fn, rounds: int) -> tuple[list[float], int, int]:
+    """Time `fn` a few times. Returns the latencies, total units it reported and peak heap."""
+
+    samples = []
+    units = 0
+    reset_peak()
+    # the scrapers' progress prints would drown the report
+    with redirect_stdout(StringIO()):
+        for _ in range(rounds):
+            begin = perf_counter()
+            units += fn()
+            samples.append(perf_counter() - begin)
+    _, peak = get_traced_memory()
+
+    return (samples, units, peak)
+
+
+def stages(rounds: int) -> dict:
+    """Every stage of the pipeline, each returning how many units of work it did."""
+
+    def artsy():
+        works, _ = scrape_artsy("", 5, validate=False)
+        return len(works)
+
+    def sothebys():
+        works, _ = scrape_sothebys("ALL", 5, validate=False)
+        return len(works)
+
+    def scraper():
+        q = Queue()
+        Scraper(q, 10, 0, "", scrape_artsy).run()
+        return q.qsize() - 1  # minus the sentinel
+
+    def scraper_cold():
+        # every image has to be downloaded again
+        rmtree(image_cache.directory, ignore_errors=True)
+        return scraper()
+
+    def async_scraper():
+        q = Queue()
+        rmtree(image_cache.directory, ignore_errors=True)
+        aio.AsyncScraper(q, 10, 0, "", scrape_artsy).run()
+        return q.qsize() - 1  # minus the sentinel
+
+    image = path.join(FIXTURES, "work.jpg")
+
+    def decode():
+        prepare(image, DISP_HEIGHT)
+        return 1
+
+    # the same image submitted twice is prepared once, so give the pool distinct files
+    copies = [f"work-{i}.jpg" for i in range(8)]
+    for copy in copies:
+        copyfile(image, copy)
+
+    def decode_pool():
+        # prepared renditions are cached, every round should decode again
+        renditions.clear()
+        futures = [images.submit(copy, DISP_HEIGHT) for copy in copies]
+        return sum(1 for future in futures if future.result())
+
+    return {
+        "scrape_artsy": (artsy, rounds, "works"),
+        "scrape_sothebys": (sothebys, rounds, "works"),
+        "Scraper.run": (scraper_cold, max(1, rounds // 4), "works"),
+        "Scraper.run warm": (scraper, max(1, rounds // 4), "works"),
+        "AsyncScraper.run": (async_scraper, max(1, rounds // 4), "works"),
+        "image prepare": (decode, rounds, "images"),
+        "image pool x8": (decode_pool, max(1, rounds // 4), "images"),
+    }
+
+
+def main():
+    """Start the stand-ins, run every stage and compare it to the baseline."""
+
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--latency", type=float, default=0, help="ms added to every response"
+    )
+    parser.add_argument("--rounds", type=int, default=20, help="calls per stage")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store the results as baseline"
+    )
+    args = parser.parse_args()
+
+    StandIn.latency = args.latency / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    Thread(target=server.serve_forever, daemon=True).start()
+    StandInAdapter.server = f"http://127.0.0.1:{server.server_port}"
+    net.configure(adapter_cls=StandInAdapter)
+    StandInRequest.server = StandInAdapter.server
+    aio.configure(
+        lambda **kwargs: ClientSession(request_class=StandInRequest, **kwargs)
+    )
+
+    # the pipeline itself is measured, not the politeness towards real sites
+    net.limiter.rate = net.limiter.capacity = 1_000_000
+
+    # Sotheby's searches directly once the parameters are known, as after a first game
+    recorded = loads(fixture("algolia_queries.json"))
+    body = dumps({"requests": [recorded["request"]]}).encode("utf8")
+    headers = {"Content-Type": "application/json"}
+
+    try:
+        with open(BASELINE, encoding="utf8") as file:
+            baseline = load(file)
+    except OSError:
+        baseline = {}
+
+    results = {}
+    client.remember("ALL", f"{ALGOLIA_URL}?x-algolia-agent=bench", headers, body)
+
+    # worker processes start once per session in the game, not once per decode
+    images.submit(path.join(FIXTURES, "work.jpg"), DISP_HEIGHT).result()
+
+    print(
+        f"{'stage':<18}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+        f"{'per s':>9}{'heap MB':>9}{'vs baseline':>16}"
+    )
+    start()
+    for name, (fn, rounds, unit) in stages(args.rounds).items():
+        samples, units, peak = run_stage(fn, rounds)
+        p50, p90, p99 = percentiles(samples)
+        rate = units / sum(samples)
+
+        results[name] = {
+            "p50": round(p50, 2),
+            "p90": round(p90, 2),
+            "p99": round(p99, 2),
+            "rate": round(rate, 2),
+        }
+        before = baseline.get(name, {}).get("p50")
+        # a stage the baseline doesn't know yet is flagged, not quietly left out
+        delta = f"{(p50 - before) / before:+.0%} p50" if before else "not in baseline"
+        print(
+            f"{name:<18}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}"
+            f"{rate:>9.1f}{peak / 1e6:>9.1f}{delta:>16}   ({unit}/s)"
+        )
+    stop()
+
+    images.shutdown()
+    server.shutdown()
+    chdir(ROOT)
+    SCRATCH.cleanup()
+
+    # ru_maxrss is in KB on Linux
+    print(f"peak RSS: {getrusage(RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    if args.save_baseline:
+        with open(BASELINE, "w", encoding="utf8") as file:
+            dump(results, file, indent=1)
+        print(f"baseline saved to {path.relpath(BASELINE, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
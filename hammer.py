@@ -1,17 +1,31 @@
 """Main application runner for HammerPy - entry point."""
 
-from tkinter import Tk
-from hammerpy.gui import HammerPy
+# imported first, so the startup profile's clock starts before anything heavy loads
+from hammerpy import startup
+
+# pylint: disable=wrong-import-position
+import sys
 
 
 class Window:
     """The game window. Runs thbe main event loop after defining some basic styles."""
 
     def __init__(self):
+        # the GUI stack is only loaded for the game, the harvest runs without it
+        from tkinter import Tk
+
+        startup.mark("import tkinter")
+
+        from hammerpy.gui import HammerPy
+
+        startup.mark("import hammerpy.gui")
+
         self._width = 1080
         self._height = 720
         self._bg = "#010012"
         self.root = Tk()
+        self._mapped = None  # the binding that waits for the first frame
+        startup.mark("create Tk root")
         self.app = HammerPy(self.root, self._width, self._height, self._bg)
 
     def setup_window(self):
@@ -33,10 +47,28 @@ class Window:
         self.root.bind("<Control_L>+q", self.app.quit_game)
         self.root.createcommand("::tk::mac::Quit", self.app.quit_game)
 
+        # an idle callback can run before anything is on screen, so wait for the
+        # window to be mapped instead
+        self._mapped = self.root.bind("<Map>", self._first_frame)
         self.root.mainloop()
 
+    def _first_frame(self, _e=None):
+        """Report the startup profile once the window is mapped and drawn."""
+
+        # root bindings also see the Map events of every widget, only the first counts
+        self.root.unbind("<Map>", self._mapped)
+        # Tk draws in idle callbacks, flush them so the frame is really painted
+        self.root.update_idletasks()
+        startup.report()
+
 
 if __name__ == "__main__":
-    window = Window()
-    window.setup_window()
-    window.run_app()
+    if sys.argv[1:2] == ["harvest"]:
+        # headless, fills the catalog without opening a window
+        from hammerpy.harvest import main
+
+        main(sys.argv[2:])
+    else:
+        window = Window()
+        window.setup_window()
+        window.run_app()
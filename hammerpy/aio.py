@@ -0,0 +1,264 @@
+"""asyncio scraping engine - an alternative to the thread based Scraper."""
+
+import asyncio
+from collections.abc import Callable
+from os import makedirs, path, remove, replace
+from random import randint, shuffle
+from threading import Thread
+from queue import Queue
+from types import FunctionType
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+from requests.exceptions import RequestException
+
+from hammerpy.artsy import (
+    AGENTP1,
+    AGENTP2,
+    PAGEMAX,
+    listing_url,
+    page_key,
+    grid_items,
+    parse_item,
+    to_usd,
+)
+from hammerpy.imagecache import image_cache
+from hammerpy.net import CHUNK_SIZE, POOL_MAXSIZE, limiter
+from hammerpy.pagecache import pages
+from hammerpy.rates import rates
+from hammerpy.util import Artwork
+
+# max number of requests in flight at once, across all hosts
+MAX_IN_FLIGHT = 64
+
+# how many listing pages are scraped at the same time
+LISTING_WORKERS = 4
+
+# makes the session every engine runs on, see configure
+_session_factory = ClientSession
+
+
+def configure(session_factory: Callable[..., ClientSession] = ClientSession):
+    """Swap the transport of the engine, like net.configure does for the threaded one.
+
+    `session_factory` gets ClientSession's keyword arguments, and can e.g. send
+    every request to a local stand-in.
+    """
+
+    global _session_factory
+
+    _session_factory = session_factory
+
+
+class AsyncScraper(Thread):
+    """Runs listing fetches, currency lookups and image downloads as tasks on one event loop.
+
+    Takes the same arguments as Scraper and feeds the queue the same (Artwork, save_path)
+    tuples followed by a None sentinel, so the two are interchangeable.
+    """
+
+    def __init__(
+        self,
+        queue: Queue,
+        limit: int,
+        src_type: int,
+        slug: str,
+        scrape_fn: FunctionType,
+        workers: int = LISTING_WORKERS,
+        catalog=None,
+    ):
+        super().__init__()
+        self.daemon = True
+        self._running = True
+        self._q = queue
+        self._limit = limit
+        self._src = src_type
+        self._slug = slug
+        self._scrape = scrape_fn
+        self._workers = workers
+        self._catalog = catalog
+
+        self._count = 0  # works delivered to the queue
+        self._claimed = 0  # works delivered or currently being downloaded
+        self._exhausted = False
+        self._rates = {}
+        self._in_flight = None
+
+    def stop(self):
+        """Stop the scraping procedure."""
+
+        self._running = False
+
+    def run(self):
+        """Run the event loop until the quota is filled or the scraper is stopped."""
+
+        try:
+            makedirs(image_cache.directory, exist_ok=True)
+            asyncio.run(self._main())
+        finally:
+            # e.g. a mixed scrape still has scrapes of its own in flight
+            if close := getattr(self._scrape, "close", None):
+                close()
+            # the consumer waits for this, even if scraping failed part way
+            self._q.put_nowait(None)
+
+    async def _main(self):
+        """Start the listing workers on a shared connection pool."""
+
+        self._in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+        async with _session_factory(
+            connector=TCPConnector(limit=MAX_IN_FLIGHT, limit_per_host=POOL_MAXSIZE),
+            headers={"User-Agent": f"{AGENTP1} {AGENTP2}"},
+            timeout=ClientTimeout(total=10),
+        ) as session:
+            await asyncio.gather(*(self._worker(session) for _ in range(self._workers)))
+
+    def _wanted(self) -> int:
+        """How many more works still need to be claimed."""
+
+        if not self._running or self._exhausted:
+            return 0
+        return self._limit - self._claimed
+
+    async def _worker(self, session: ClientSession):
+        """Scrape pages and start a download task for each work taken from them."""
+
+        while self._wanted() > 0:
+            candidates = await self._candidates(session, randint(1, self._wanted()))
+
+            tasks = []
+            for work, code in candidates:
+                if self._wanted() <= 0:
+                    break
+                self._claimed += 1
+                tasks.append(asyncio.create_task(self._complete(session, work, code)))
+
+            if tasks:
+                await asyncio.gather(*tasks)
+
+    async def _candidates(
+        self, session: ClientSession, amount: int
+    ) -> list[tuple[Artwork, str]]:
+        """Get unvalidated works, each paired with the currency code of its prices."""
+
+        # only Artsy has a native async path, other sources run on a helper thread
+        if self._src:
+            works, self._exhausted = await asyncio.to_thread(
+                self._scrape, self._slug, amount, validate=False
+            )
+            return [(work, "usd") for work in works]
+
+        # recently seen pages come from the cache, stale ones are revalidated
+        page = randint(1, PAGEMAX)
+        key = page_key(self._slug, page)
+        html, validators = pages.lookup(key)
+        if html is None:
+            try:
+                status, headers, text = await self._fetch_page(
+                    session, listing_url(self._slug, page), validators
+                )
+            except (ClientError, asyncio.TimeoutError):
+                return []
+            html = pages.update(key, status, headers, text)
+
+        items = grid_items(html)
+        shuffle(items)
+
+        candidates = []
+        for item in items:
+            if parsed := parse_item(*item):
+                candidates.append(parsed)
+                if len(candidates) == amount:
+                    break
+
+        return candidates
+
+    async def _complete(self, session: ClientSession, work: Artwork, code: str):
+        """Convert a work's prices and download its image, then hand it to the consumer."""
+
+        # images seen before are on disk already and cost no request, held
+        # in the same step so they can't be evicted in the meantime
+        save_path = image_cache.lookup(work.image_url, hold=True)
+        saved = bool(save_path)
+        if not saved:
+            # held before it's written, for the same reason
+            save_path = image_cache.file_for(work.image_url)
+            image_cache.hold(save_path)
+
+        try:
+            if code != "usd":
+                to_usd(work, await self._rate(code))
+            if not saved:
+                saved = await self._fetch_image(session, work.image_url, save_path)
+                if saved:
+                    image_cache.admit(save_path)
+        except (
+            ClientError,
+            RequestException,
+            asyncio.TimeoutError,
+            KeyError,
+            ValueError,
+        ):
+            saved = False
+
+        if saved and self._running and self._count < self._limit:
+            self._count += 1
+            if self._catalog:
+                self._catalog.add(self._src, self._slug, work, save_path)
+            print(f"Downloaded {self._count}/{self._limit}")
+            self._q.put_nowait((work, save_path))
+        else:
+            image_cache.release(save_path)
+            self._claimed -= 1
+
+    async def _rate(self, code: str) -> float:
+        """Exchange rate for a currency, from the shared table fetched once per session."""
+
+        if code not in self._rates:
+            self._rates = await asyncio.to_thread(rates.table)
+
+        return float(self._rates[code])
+
+    async def _throttle(self, url: str):
+        """Wait for the shared per-host rate limiter without blocking the loop."""
+
+        bucket = limiter.bucket(url)
+        while wait := bucket.take():
+            await asyncio.sleep(wait)
+
+    async def _fetch_page(
+        self, session: ClientSession, url: str, headers: dict
+    ) -> tuple[int, dict, str]:
+        """GET a page, returning its status, headers and body as text."""
+
+        await self._throttle(url)
+        async with self._in_flight:
+            async with session.get(url, headers=headers) as resp:
+                return (resp.status, resp.headers, await resp.text())
+
+    async def _fetch_image(
+        self, session: ClientSession, url: str, save_path: str
+    ) -> bool:
+        """Validate and save an image in a single streamed GET, like net.fetch_image."""
+
+        await self._throttle(url)
+        # named per task since two works can share a save path
+        part_path = f"{save_path}.{id(asyncio.current_task())}.part"
+        async with self._in_flight:
+            try:
+                async with session.get(url) as resp:
+                    if resp.status != 200 or not resp.headers.get(
+                        "Content-Type", "image/"
+                    ).startswith("image/"):
+                        return False
+
+                    with open(part_path, "wb") as file:
+                        async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                            file.write(chunk)
+
+                replace(part_path, save_path)
+            finally:
+                # whatever went wrong, no half image is left behind
+                if path.isfile(part_path):
+                    remove(part_path)
+
+        return True
@@ -0,0 +1,138 @@
+"""Direct client for the Algolia search endpoint behind Sotheby's listing pages."""
+
+from json import dumps, load, loads
+from os import makedirs, path, replace
+from threading import Lock
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from hammerpy.net import request
+from hammerpy.util import CACHE_DIR
+
+# multi-query endpoint the Sotheby's site searches through
+ALGOLIA_URL = "https://kar1ueupjd-dsn.algolia.net/1/indexes/*/queries"
+
+# request parameters captured from the site, per category
+ALGOLIA_FILE = f"{CACHE_DIR}/algolia.json"
+
+# headers worth replaying, the api key may be restricted to the site's referer
+KEPT_HEADERS = ("content-type", "origin", "referer")
+
+# hits per page Algolia answers with when the query doesn't set hitsPerPage
+DEFAULT_HITS_PER_PAGE = 20
+
+
+class AlgoliaClient:
+    """Replays the site's own search request with plain HTTP instead of a browser.
+
+    The api key, index and filters can't be known up front, so they are captured
+    from a browser once per category (see `remember`) and reused until they stop
+    working.
+    """
+
+    def __init__(self, store: str = ALGOLIA_FILE):
+        self.store = store
+        self._templates = {}
+        self._lock = Lock()
+
+        try:
+            with open(store, encoding="utf8") as file:
+                self._templates = load(file)
+        except (OSError, ValueError):
+            pass
+
+    def has_template(self, cat: str) -> bool:
+        """Whether the parameters for a category have been captured yet."""
+
+        return cat in self._templates
+
+    def remember(self, cat: str, url: str, headers: dict, body: bytes):
+        """Save the parameters of a search request the site made for a category."""
+
+        template = {
+            "query": urlsplit(url).query,
+            "headers": {
+                name: value
+                for name, value in headers.items()
+                if name.lower() in KEPT_HEADERS or name.lower().startswith("x-algolia")
+            },
+            # the first query is the one that returns the listed items
+            "request": loads(body.decode("utf8"))["requests"][0],
+        }
+
+        with self._lock:
+            self._templates[cat] = template
+            self._save()
+
+    def forget(self, cat: str):
+        """Drop stale parameters, also on disk, so the next search recaptures them."""
+
+        with self._lock:
+            if self._templates.pop(cat, None):
+                self._save()
+
+    def _save(self):
+        """Atomically write every template, call with the lock held."""
+
+        makedirs(path.dirname(self.store), exist_ok=True)
+        tmp_path = f"{self.store}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as file:
+            file.write(dumps(self._templates))
+        replace(tmp_path, self.store)
+
+    def hits_per_page(self, cat: str) -> int:
+        """How many works the site lists on each page of a category."""
+
+        params = self._templates.get(cat, {}).get("request", {}).get("params", "")
+        if not isinstance(params, dict):
+            params = dict(parse_qsl(params))
+
+        try:
+            return int(params.get("hitsPerPage", DEFAULT_HITS_PER_PAGE))
+        except ValueError:
+            return DEFAULT_HITS_PER_PAGE
+
+    def search(self, queries: list[tuple[str, int]], timeout: int = 10) -> list[dict]:
+        """Run several (category, page) searches in a single multi-query call.
+
+        Returns one Algolia result (with "hits" and "nbPages") per query, in order.
+        Pages are numbered from 1 like on the site.
+        """
+
+        batch = []
+        for cat, page in queries:
+            template = self._templates[cat]
+            batch.append(with_page(template["request"], page - 1))
+
+        # all categories share the same key, so any template's url and headers will do
+        template = self._templates[queries[0][0]]
+        resp = request(
+            "POST",
+            f"{ALGOLIA_URL}?{template['query']}",
+            headers=template["headers"],
+            data=dumps({"requests": batch}),
+            timeout=timeout,
+        )
+        resp.raise_for_status()
+
+        return resp.json()["results"]
+
+
+def with_page(query: dict, page: int) -> dict:
+    """Copy of an Algolia query pointed at another (0-based) page."""
+
+    query = dict(query)
+    params = query.get("params", "")
+
+    if isinstance(params, dict):
+        query["params"] = {**params, "page": page}
+    else:
+        pairs = [
+            (k, v) for k, v in parse_qsl(params, keep_blank_values=True) if k != "page"
+        ]
+        query["params"] = urlencode(pairs + [("page", page)])
+
+    return query
+
+
+# shared by every Sotheby's scrape in the session
+client = AlgoliaClient()
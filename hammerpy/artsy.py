@@ -1,30 +1,18 @@
 """Scrapes Artwork instances from the popular auction exchange Artsy.net."""
 
 from math import floor
-from re import sub, findall
+from re import compile as compile_re, sub, findall, IGNORECASE
 from random import choice, randint
 from urllib.parse import unquote
-from enum import Enum
+from html import unescape
 
-from requests import get
-from requests.exceptions import Timeout
-from bs4 import BeautifulSoup
+from requests.exceptions import RequestException, Timeout
+from hammerpy.net import probe
+from hammerpy.pagecache import pages
+from hammerpy.rates import exchange_rate
+from hammerpy.trace import span
 from hammerpy.util import Artwork
 
-
-# Create enum to represent different artwork mediums
-class Medium(Enum):
-    "Enum to track the different types of art available on the website."
-
-    ALL = ""
-    PAINTING = "ion/painting"
-    PRINTS = "ion/prints"
-    PHOTOGRAPHY = "ion/photography"
-    SCULPTURE = "ion/sculpture"
-    WORKS_ON_PAPER = "ion/works-on-paper"
-    DESIGN = "ion/design"
-    MIXED_MEDIA = "ion/mixed-media"
-
 # User agent
 AGENTP1 = "Mozilla/5.0 (Windows Phone 10.0; Android 6.0.1; Microsoft; RM-1152) AppleWebKit/537.36"
 AGENTP2 = "(KHTML, like Gecko) Chrome/52.0.2743.116 Mobile Safari/537.36 Edge/15.15254"
@@ -43,92 +31,270 @@ CURRENCIES = {
     "KRW ₩": "krw",
 }
 
-# URL prefix for scraping
-PREFIX = "https://cdn.jsdelivr.net/gh/fawazahmed0/currency-api@1/latest/currencies/usd/"
+# base URL of the listing pages, kept separate so it can be pointed at a local server
+ARTSY_URL = "https://www.artsy.net"
 
 # max number of pages that will be searched
 PAGEMAX = 100
 
-def scrape_artsy(slug: str, amount: int) -> tuple[list[Artwork], bool]:
-    """The main scraper function itself."""
+
+def listing_url(slug: str, page: int) -> str:
+    """URL of a listing page for the given Medium slug."""
+
+    return f"{ARTSY_URL}/collect{slug}?page={page}"
+
+
+def page_key(slug: str, page: int) -> str:
+    """Key a listing page is stored under in the page cache."""
+
+    return f"artsy{slug}?page={page}"
+
+
+# the only tags that matter when pulling works out of a listing page, a quoted
+# attribute value may contain ">"
+ATTR_CHARS = r"""(?:"[^"]*"|'[^']*'|[^'">])*"""
+GRID_TAGS = compile_re(rf"<(div|img)\b({ATTR_CHARS})>|</div\s*>", IGNORECASE)
+GRID_START = compile_re(r"""data-test\s*=\s*["']?artworkGridItem\b""")
+TAG_ATTRS = compile_re(r"""([^\s=/>]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?""")
+INNER_TAGS = compile_re(rf"<{ATTR_CHARS}>")
+
+# markup in comments, scripts and styles is never part of the page, whatever it looks like
+NOT_MARKUP = compile_re(r"<(!--|script\b|style\b)", IGNORECASE)
+NOT_MARKUP_END = {
+    "!--": compile_re(r"-->"),
+    "script": compile_re(r"</script\s*>", IGNORECASE),
+    "style": compile_re(r"</style\s*>", IGNORECASE),
+}
+
+
+def tag_attrs(raw: str) -> dict[str, str]:
+    """Parse the attributes of a start tag into a dict."""
+
+    attrs = {}
+    for name, value in TAG_ATTRS.findall(raw):
+        if value[:1] in ("'", '"'):
+            value = value[1:-1]
+        attrs.setdefault(name.lower(), unescape(value))
+
+    return attrs
+
+
+def strip_non_markup(html: str) -> str:
+    """Drop comments, scripts and styles, as an HTML parser would skip them."""
+
+    parts = []
+    pos = 0
+    while found := NOT_MARKUP.search(html, pos):
+        parts.append(html[pos : found.start()])
+        end = NOT_MARKUP_END[found.group(1).lower()].search(html, found.end())
+        if not end:
+            # unterminated, everything after it is swallowed
+            return "".join(parts)
+        pos = end.end()
+
+    parts.append(html[pos:])
+    return "".join(parts)
+
+
+def grid_items(html: str) -> list[tuple[str, str, str]]:
+    """Pull the (price text, image src, image alt) of every work on a listing page.
+
+    A single regex pass over the div and img tags replaces building a full soup. It
+    matches what findNext did for each artworkGridItem div: an item takes the first
+    bold div and the first img that come after it in the document. Comments, scripts
+    and styles are dropped first, since the parser never saw tags in them either.
+    """
+
+    html = strip_non_markup(html)
+
+    # artworkGridItem is identifier for any work on the page, nothing before
+    # the first one matters
+    if not (found := GRID_START.search(html)):
+        return []
+    start = found.start()
+
+    items = []  # [price text, image src, image alt] per grid item
+    need_price = []
+    need_img = []
+    price_start = None  # where the text of the bold div being read starts
+    depth = 0  # nesting of divs inside that bold div
+
+    for tag in GRID_TAGS.finditer(html, html.rfind("<", 0, start)):
+        name = tag.group(1)
+
+        # a closing div, only interesting when it ends the price
+        if name is None:
+            if price_start is None:
+                continue
+            if depth:
+                depth -= 1
+                continue
+
+            text = unescape(INNER_TAGS.sub("", html[price_start : tag.start()]))
+            for item in need_price:
+                item[0] = text
+            need_price = []
+            price_start = None
+
+        elif name.lower() == "img":
+            if need_img:
+                attrs = tag_attrs(tag.group(2))
+                for item in need_img:
+                    item[1] = attrs.get("src", "")
+                    item[2] = attrs.get("alt", "")
+                need_img = []
+
+        elif price_start is not None:
+            depth += 1
+
+        # only pay for attribute parsing on divs that can matter, names are
+        # matched in lower case like tag_attrs does
+        elif "artworkgriditem" in (raw := tag.group(2).lower()) or (
+            need_price and "font-weight" in raw
+        ):
+            attrs = tag_attrs(tag.group(2))
+            if attrs.get("data-test") == "artworkGridItem":
+                item = [None, None, None]
+                items.append(item)
+                need_price.append(item)
+                need_img.append(item)
+            elif attrs.get("font-weight") == "bold":
+                price_start = tag.end()
+                depth = 0
+
+    return [tuple(item) for item in items if item[0] is not None and item[1]]
+
+
+def parse_item(price: str, imgurl: str, alt: str) -> tuple[Artwork, str] | None:
+    """Build an Artwork priced in its listed currency, along with that currency's code.
+
+    Returns None for works without a usable price or image.
+    """
+
+    price = price.replace(",", "")
+
+    work_prices = []
+    if price.startswith("US$"):
+        code = "usd"
+        price = price.replace("US$", "").replace(",", "")
+        price = price.replace("–", "-").strip()
+
+        prices = price.split("-")
+        work_prices.append(int(prices[0]))
+        work_prices.append(int(prices[-1]))
+
+    # find non US currency symbol, search in dict, the caller
+    # looks it up in the rate table to get conversion rate for USD
+    elif intl_money := [c for c in CURRENCIES if price.startswith(c)]:
+        code = CURRENCIES[intl_money[0]]
+        prices = findall(r"((\d,*)+)", price)
+        p1 = p2 = int(prices[0][0].replace(",", ""))
+
+        # hyphen indicates price RANGE, no hyphen means
+        # first price is same as "second" price
+        if "-" in price:
+            p2 = int(prices[1][0].replace(",", ""))
+
+        work_prices.append(p1)
+        work_prices.append(p2)
+    else:
+        # if currency is not found or it's a phrase like "contact for price",
+        # "sold", etc - oh well pick another artwork
+        return None
+
+    try:
+        # check if fullsize url is available, it uses the keyword 'normalized'
+        img = imgurl[imgurl.index("https%") : imgurl.rindex(".jpg") + 4]
+        img = unquote(sub("(larger?)", "normalized", img))
+
+        # format title into "name - 'work' (date)"
+        title = alt.replace(",", " -", 1)
+        title = (
+            title.replace(title[title.rindex(",") : title.rindex(",") + 2], " (") + ")"
+        )
+    except ValueError:
+        return None
+
+    return (Artwork(title, img, work_prices), code)
+
+
+def to_usd(work: Artwork, exchange_rate: float):
+    """Convert the prices of a work from its listed currency to USD."""
+
+    work.prices = [floor(p / exchange_rate) for p in work.prices]
+
+
+def validated(url: str) -> bool:
+    """Probe an image URL, as a span of the trace."""
+
+    with span("artsy.validate"):
+        return probe(url)
+
+
+def scrape_artsy(
+    slug: str, amount: int, validate: bool = True
+) -> tuple[list[Artwork], bool]:
+    """The main scraper function itself.
+
+    Pass validate=False if the caller checks each image while downloading it.
+    """
 
     l = 0
     works = []
     while not l:
-        # pick a random page and get its content
-        url = f"https://www.artsy.net/collect{slug}?page={randint(1,PAGEMAX)}"
+        # pick a random page and get its content, recently seen pages come from the cache
+        page = randint(1, PAGEMAX)
         try:
-            dump = get(url, data={"User-Agent": f"{AGENTP1} {AGENTP2}"}, timeout=10)
+            with span("artsy.listing", page=page):
+                html = pages.fetch(
+                    page_key(slug, page),
+                    listing_url(slug, page),
+                    headers={"User-Agent": f"{AGENTP1} {AGENTP2}"},
+                    timeout=10,
+                )
         except Timeout:
             continue
 
-        # artworkGridItem is identifier for any work on the page, we choose a random one
-        artdivs = BeautifulSoup(dump.text, "html.parser")
-        artdivs = artdivs.find_all("div", attrs={"data-test": "artworkGridItem"})
-        if not artdivs:
+        # we choose random works from the page
+        with span("artsy.parse"):
+            items = grid_items(html)
+        if not items:
             continue
 
         for i in range(amount):
-            div = choice(artdivs)
-
-            price = div.findNext("div", attrs={"font-weight": "bold"})
-            price = price.text.replace(",", "")
+            item = choice(items)
 
-            # get the image
-            img_tag = div.findNext("img")
+            parsed = parse_item(*item)
+            if not parsed:
+                items.remove(item)
+                if not items:
+                    break
+                continue
 
-            # check if fullsize url is available
-            imgurl = img_tag.get("src")
-            img = imgurl[imgurl.index("https%") : imgurl.rindex(".jpg") + 4]
-            img = unquote(sub("(larger?)", "normalized", img))
+            work, code = parsed
 
-            # check for HTTPError for fullsized url cause it uses the keyword 'normalized'
-            # if unavailable try a different work
-            if get(img, timeout=10).status_code != 200:
-                artdivs.remove(div)
-                continue
+            # exchange rate lookup for foreign currencies, answered from
+            # the session's cached rate table so it costs no extra requests
+            try:
+                if code != "usd":
+                    with span("artsy.rate", currency=code):
+                        to_usd(work, exchange_rate(code))
+                usable = True
+            except (RequestException, ValueError, KeyError):
+                usable = False
 
-            work_prices = []
-            if price.startswith("US$"):
-                price = price.replace("US$", "").replace(",", "")
-                price = price.replace("–", "-").strip()
-
-                prices = price.split("-")
-                work_prices.append(int(prices[0]))
-                work_prices.append(int(prices[-1]))
-
-            # find non US currency symbol, search in dict,
-            # if found look up in api to get conversion rate for USD
-            elif intl_money := [c for c in CURRENCIES if price.startswith(c)]:
-                # exchange rate lookup for foreign currencies
-                prices = findall(r"((\d,*)+)", price)
-                p1 = p2 = int(prices[0][0].replace(",", ""))
-                rate_json = get(f"{CURRENCIES[intl_money[0]]}.json", timeout=10).json()
-
-                exchange_rate = float(rate_json[CURRENCIES[intl_money[0]]])
-
-                # no hyphen means first price is same as "second" price
-                work_prices.append(floor(p1 / exchange_rate))
-
-                # hyphen indicates price RANGE, so need to convert 2nd price as well
-                if "-" in price:
-                    p2 = int(prices[1][0].replace(",", ""))
-                    work_prices.append(floor(p2 / exchange_rate))
-            else:
-                # if currency is not found or it's a phrase like "contact for price",
-                # "sold", etc - oh well pick another artwork
+            # check for HTTPError for fullsized url, if unavailable try a different
+            # work. A HEAD is enough here - when the caller is going to download
+            # the image anyway it validates during that fetch
+            if not usable or (validate and not validated(work.image_url)):
+                items.remove(item)
+                if not items:
+                    break
                 continue
 
-            # format title into "name - 'work' (date)"
-            title = img_tag.get("alt").replace(",", " -", 1)
-            title = (
-                title.replace(title[title.rindex(",") : title.rindex(",") + 2], " (")
-                + ")"
-            )
-
-            works.append(Artwork(title, img, work_prices))
-            artdivs.remove(div)
-            if not artdivs:
+            works.append(work)
+            items.remove(item)
+            if not items:
                 break
 
         # check if there was enough results on page to satisfy quota
@@ -0,0 +1,145 @@
+"""Local SQLite catalog of every work scraped, so games can be served offline."""
+
+from os import makedirs, path
+from sqlite3 import connect
+from threading import Lock
+from time import time
+
+from hammerpy.imagecache import image_cache
+from hammerpy.util import CACHE_DIR, Artwork
+
+CATALOG_DB = f"{CACHE_DIR}/catalog.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS works (
+    id INTEGER PRIMARY KEY,
+    source INTEGER NOT NULL,
+    slug TEXT NOT NULL,
+    title TEXT NOT NULL,
+    image_url TEXT NOT NULL,
+    price_low INTEGER NOT NULL,
+    price_high INTEGER NOT NULL,
+    image_path TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    plays INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (source, slug, image_url)
+);
+CREATE INDEX IF NOT EXISTS works_by_filter ON works (source, slug, price_low);
+CREATE INDEX IF NOT EXISTS works_by_plays ON works (source, slug, plays);
+"""
+
+
+class Catalog:
+    """Every work ever scraped, with its USD prices and where its image is cached.
+
+    Images live in the shared image cache, a work whose image was evicted is
+    dropped from the catalog the next time it's picked.
+    """
+
+    def __init__(self, db_path: str = CATALOG_DB):
+        makedirs(path.dirname(db_path), exist_ok=True)
+
+        # one connection shared by the scraper threads, serialized by the lock
+        self._lock = Lock()
+        self._db = connect(db_path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    def add(self, src: int, slug: str, work: Artwork, image_path: str):
+        """Record a freshly downloaded work and where its image is."""
+
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                INSERT INTO works (source, slug, title, image_url, price_low,
+                                   price_high, image_path, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, slug, image_url) DO UPDATE SET
+                    title = excluded.title,
+                    price_low = excluded.price_low,
+                    price_high = excluded.price_high,
+                    image_path = excluded.image_path,
+                    fetched_at = excluded.fetched_at
+                """,
+                (
+                    src,
+                    slug,
+                    work.title,
+                    work.image_url,
+                    work.prices[0],
+                    work.prices[-1],
+                    image_path,
+                    time(),
+                ),
+            )
+
+    def count(self, src: int, slug: str) -> int:
+        """How many works are catalogued for a source and filter."""
+
+        with self._lock:
+            (total,) = self._db.execute(
+                "SELECT COUNT(*) FROM works WHERE source = ? AND slug = ?", (src, slug)
+            ).fetchone()
+        return total
+
+    def pick(
+        self,
+        src: int,
+        slug: str,
+        amount: int,
+        min_price: int = 0,
+        max_price: int | None = None,
+        exclude: list[str] = (),
+    ) -> list[tuple[Artwork, str]]:
+        """Pick random works, least played first, holding their images in the cache.
+
+        Works whose image URL is in `exclude` (e.g. already in the game) are
+        skipped. Picking doesn't count as playing them, see `played`.
+        """
+
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT id, title, image_url, price_low, price_high
+                FROM works
+                WHERE source = ? AND slug = ? AND price_low >= ? AND price_low <= ?
+                    AND image_url NOT IN ({", ".join("?" * len(exclude))})
+                ORDER BY plays, RANDOM()
+                LIMIT ?
+                """,
+                (src, slug, min_price, max_price or 2**63 - 1, *exclude, amount),
+            ).fetchall()
+
+        works = []
+        missing = []
+        for row_id, title, image_url, low, high in rows:
+            save_path = image_cache.lookup(image_url, hold=True)
+            if not save_path:
+                missing.append((row_id,))
+                continue
+
+            works.append((Artwork(title, image_url, [low, high]), save_path))
+
+        with self._lock, self._db:
+            # the image was deleted from under us, the work will be scraped again
+            self._db.executemany("DELETE FROM works WHERE id = ?", missing)
+
+        return works
+
+    def played(self, src: int, slug: str, works: list[Artwork]):
+        """Count a play for the works of a game, wherever they came from."""
+
+        with self._lock, self._db:
+            self._db.executemany(
+                """
+                UPDATE works SET plays = plays + 1
+                WHERE source = ? AND slug = ? AND image_url = ?
+                """,
+                [(src, slug, work.image_url) for work in works],
+            )
+
+    def close(self):
+        """Close the database."""
+
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,225 @@
+"""Pool of headless Chrome drivers, launched once and reused across scrapes and games."""
+
+from contextlib import contextmanager
+from re import escape
+from threading import Condition
+from urllib.parse import urlsplit
+
+from seleniumwire import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+from hammerpy.algolia import ALGOLIA_URL
+from hammerpy.artsy import AGENTP1, AGENTP2
+
+# max number of browsers running at once
+POOL_SIZE = 2
+
+# a browser is relaunched after this many pages, which bounds its memory growth
+MAX_USES = 25
+
+# the only requests the proxy records, everything else passes straight through it
+CAPTURE_SCOPES = [escape(urlsplit(ALGOLIA_URL).netloc)]
+
+# resources the browser never fetches, none of them are needed to reach the search
+BLOCKED_URLS = [
+    "*.jpg*",
+    "*.jpeg*",
+    "*.png*",
+    "*.gif*",
+    "*.webp*",
+    "*.svg*",
+    "*.css*",
+    "*.woff*",
+    "*.ttf*",
+    "*.mp4*",
+    "*googletagmanager.com*",
+    "*google-analytics.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+]
+
+
+class DriverPool:
+    """Hands out healthy drivers, launching them lazily and recycling worn out ones."""
+
+    def __init__(self, size: int = POOL_SIZE, max_uses: int = MAX_USES):
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = []
+        self._uses = {}  # driver -> pages loaded
+        self._live = 0  # running browsers, including ones being launched
+        self._cond = Condition()
+        self._closed = False
+
+    def _launch(self) -> webdriver.Chrome:
+        """Start a new headless browser."""
+
+        options = Options()
+        options.add_argument(f"--user-agent={AGENTP1} {AGENTP2}")
+        options.add_argument("--headless")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        # get() returns at once, callers wait for the request or element they need
+        options.page_load_strategy = "none"
+
+        driver = webdriver.Chrome(options=options)
+        driver.scopes = CAPTURE_SCOPES
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+        return driver
+
+    def _forget(self, driver: webdriver.Chrome) -> bool:
+        """Stop counting a browser that is being retired, call with the condition held.
+
+        Returns False if it was retired already, e.g. by shutdown, so it's only quit once.
+        """
+
+        if driver not in self._uses:
+            return False
+
+        del self._uses[driver]
+        self._live -= 1
+        self._cond.notify()
+        return True
+
+    @staticmethod
+    def _quit(driver: webdriver.Chrome):
+        """Quit a retired browser, outside the condition since a hung one can take a while."""
+
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    @staticmethod
+    def _healthy(driver: webdriver.Chrome) -> bool:
+        """Whether the browser still responds."""
+
+        try:
+            driver.current_url  # pylint: disable=pointless-statement
+        except WebDriverException:
+            return False
+        return True
+
+    def _acquire(self) -> webdriver.Chrome:
+        """Take an idle browser, or launch one if the pool has room, else wait.
+
+        Browsers are only talked to outside the condition, so a hung one never
+        holds up the other borrowers.
+        """
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("driver pool has been shut down")
+
+                    if self._idle:
+                        driver = self._idle.pop()
+                        break
+
+                    if self._live < self.size:
+                        # claim the slot now, the (slow) launch happens outside the lock
+                        self._live += 1
+                        driver = None
+                        break
+
+                    self._cond.wait()
+
+            if not driver:
+                break
+            if self._healthy(driver):
+                return driver
+
+            with self._cond:
+                forgotten = self._forget(driver)
+            if forgotten:
+                self._quit(driver)
+
+        try:
+            driver = self._launch()
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            closed = self._closed
+            if closed:
+                self._live -= 1
+                self._cond.notify()
+            else:
+                self._uses[driver] = 0
+
+        if closed:
+            # shut down while it was launching, so nobody else would quit it
+            self._quit(driver)
+            raise RuntimeError("driver pool has been shut down")
+        return driver
+
+    def _release(self, driver: webdriver.Chrome, broken: bool):
+        """Give a browser back, retiring it if it failed, is worn out or we're closing."""
+
+        with self._cond:
+            if driver not in self._uses:
+                # quit by shutdown while it was in use
+                return
+            self._uses[driver] += 1
+            retire = broken or self._closed or self._uses[driver] >= self.max_uses
+
+        if not retire:
+            # stop whatever the last page is still loading, and forget what it
+            # recorded so requests don't pile up in the proxy
+            try:
+                driver.execute_script("window.stop();")
+                del driver.requests
+            except WebDriverException:
+                retire = True
+
+        with self._cond:
+            # the pool may have been shut down meanwhile
+            retire = retire or self._closed
+            if retire:
+                retire = self._forget(driver)
+            else:
+                self._idle.append(driver)
+                self._cond.notify()
+
+        if retire:
+            self._quit(driver)
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver for the duration of a with block."""
+
+        driver = self._acquire()
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self._release(driver, broken)
+
+    def shutdown(self):
+        """Quit every browser, busy ones too, so none outlives the game.
+
+        A scrape still using one fails, and giving it back is a no-op.
+        """
+
+        with self._cond:
+            self._closed = True
+            self._idle = []
+            drivers = list(self._uses)
+            for driver in drivers:
+                self._forget(driver)
+            self._cond.notify_all()
+
+        for driver in drivers:
+            self._quit(driver)
+
+
+# shared by every Sotheby's scrape in the session
+pool = DriverPool()
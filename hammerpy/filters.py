@@ -0,0 +1,47 @@
+"""Filters each source can be searched by, listed without loading any scraper."""
+
+from enum import Enum
+
+
+# Create enum to represent different artwork mediums
+class Medium(Enum):
+    "Enum to track the different types of art available on the website."
+
+    ALL = ""
+    PAINTING = "ion/painting"
+    PRINTS = "ion/prints"
+    PHOTOGRAPHY = "ion/photography"
+    SCULPTURE = "ion/sculpture"
+    WORKS_ON_PAPER = "ion/works-on-paper"
+    DESIGN = "ion/design"
+    MIXED_MEDIA = "ion/mixed-media"
+
+
+# Sotheby's has a WIDE breadth of items
+#
+# We start by declaring all the different categories
+# and assign their URL slugs as their values
+class Category(Enum):
+    """For allowing the user to choose a scraping category."""
+
+    ALL = "shop-all"
+    JEWELRY = "luxury/jewelry"
+    WATCHES = "luxury/watches"
+    HANDBAGS = "fashion/handbag"
+    BOOKS = "luxury/books-&-manuscripts"
+    ART = "art-&-design"
+    COLLECTIBLES = "luxury/collectibles"
+    CARS = "luxury/vehicles/car"
+    INTERIORS = "interiors"
+    APPAREL = "fashion/apparel"
+    SNEAKERS = "fashion/sneaker"
+
+
+# Mixed games search several sources at once, each filter lists the
+# (source type, filter slug) pairs it searches
+class Mix(Enum):
+    """For allowing the user to choose what a mixed game draws from."""
+
+    ALL = ((0, Medium.ALL.value), (1, Category.ALL.name))
+    ART = ((0, Medium.ALL.value), (1, Category.ART.name))
+    PAINTING = ((0, Medium.PAINTING.value), (1, Category.ART.name))
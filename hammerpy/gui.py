@@ -1,8 +1,12 @@
 """Orchestrates the GUI and handles game events and user actions."""
 
-from math import ceil, floor
+from collections.abc import Callable
+from math import floor
+from os import environ
+from concurrent.futures import Future
 from queue import Queue, Empty
 from threading import Thread
+from time import perf_counter
 from tkinter import StringVar, IntVar, Canvas, Entry
 from tkinter.ttk import (
     Frame,
@@ -15,11 +19,27 @@ from tkinter.ttk import (
     Progressbar,
 )
 
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
-from hammerpy.artsy import scrape_artsy, Medium
-from hammerpy.sothebys import scrape_sothebys, Category
-from hammerpy.util import Guesswork, remove_works, Scraper, switch_desc, switch_limit
+from hammerpy import sources, startup, trace
+from hammerpy.sources import SOURCES
+from hammerpy.catalog import Catalog
+from hammerpy.imagecache import finish_works, image_cache
+from hammerpy.imaging import RENDITION_CACHE_BYTES, images, probe
+from hammerpy.inventory import Inventory
+from hammerpy.util import Guesswork, Scraper, switch_desc, switch_limit
+
+# which scraping engine to use, "thread" (default) or "asyncio"
+ENGINE = environ.get("HAMMERPY_ENGINE", "thread")
+
+# how often (ms) the main loop picks up prepared works, about once a frame at 60 Hz
+DRAIN_INTERVAL = 16
+
+# how long (s) each pick up may take, so drawing and input keep the rest of the frame
+DRAIN_BUDGET = 0.008
+
+# how many works after the one on screen are prepared ahead of time
+PREFETCH_AHEAD = 3
 
 
 class HammerPy(Frame):
@@ -33,12 +53,18 @@ class HammerPy(Frame):
         self.width = width
         self.height = height
         self._scraper = None
+        self._game = None  # (source, filter) of the works being played
+        self._ready = None  # prepared works waiting for the main loop
+        self._playing = False  # whether the guessing started, works may still arrive
+        self._waiting = False  # whether the player guessed every work that arrived
         self._background = bg
         self._success_color = "#00d176"
         self._failure_color = "#ed214a"
         self._select_color = "#ffd903"
         self.works = []
-        self._artwork_limit = 10
+        self.curr_work = None  # the result on screen
+        self._renditions = {}  # image path -> renditions being prepared, see _prefetch
+        self._artwork_limit = 100
         self._descriptions = [
             "Hard - the price you guess has to be within +/- 5% of the actual price\n",
             "Medium - the price you guess has to be within +/- 15% of the actual price\n",
@@ -122,35 +148,99 @@ class HammerPy(Frame):
             ],
         )
 
+        startup.mark("styles")
+
         # Add main application container
         self.backdrop = Frame(root, style="HammerPy.TFrame", padding=20)
         self.backdrop.pack(expand=True)
 
+        # every screen is built once, on first use, then only shown and updated
+        self._screens = {}
+        self._shown = None
+
+        # everything scraped is catalogued so later games can be served offline
+        self._catalog = Catalog()
+        startup.mark("catalog")
+
+        # keep some works ready for every source and filter so games can start instantly
+        self._inventory = Inventory(
+            {src: source.slugs() for src, source in SOURCES.items()},
+            catalog=self._catalog,
+        )
+        self._inventory.start()
+        startup.mark("inventory")
+
         self.draw_main_menu()
+        startup.mark("main menu")
 
     def quit_game(self, _e=None):
-        """Stop the scraper, remove unflagged downloaded works, and exit."""
-        if self._scraper and self._scraper.driver:
-            self._scraper.driver.quit()
+        """Stop the scraper, hand the works back to the image cache, and exit."""
+        if self._scraper:
+            self._scraper.stop()
+        self._inventory.stop()
+        sources.shutdown()
+        images.shutdown()
         if self.works:
-            remove_works(self.works)
+            self._catalog.played(*self._game, [w.art for w in self.works])
+            finish_works(self.works)
+        self._catalog.close()
+        trace.export()
         self._root.destroy()
 
+    def _show(self, name: str) -> Frame:
+        """Switch to a screen, building its widgets the first time it's shown.
+
+        Screens are kept around once built, so switching between them only
+        swaps which frame is packed.
+        """
+
+        if name not in self._screens:
+            screen = Frame(self.backdrop, style="HammerPy.TFrame")
+            getattr(self, f"_build_{name}")(screen)
+            self._screens[name] = screen
+
+        if self._shown != name:
+            if self._shown:
+                self._screens[self._shown].pack_forget()
+            self._screens[name].pack(expand=True)
+            self._shown = name
+
+        return self._screens[name]
+
     def draw_main_menu(self, _e=None):
         """Renders and lays out the main game menu (home screen)."""
 
         self._unbindall()
-        for widget in self.backdrop.winfo_children():
-            widget.destroy()
 
         # check if this a fresh start or we are returning
         # from the conclusion of a previous game
         if self.works:
-            remove_works(self.works)
+            self._catalog.played(*self._game, [w.art for w in self.works])
+            finish_works(self.works)
+            self.works = []
+            self._renditions = {}
+
+        self._show("menu")
+
+        # Bind events directly to backdrop so user can press whatever without clicking to get focus
+        self._root.bind("q", self.quit_game)
+        self._root.bind("<Return>", self.collect_works)
+        self._root.bind("<Up>", self._switch_filter)
+        self._root.bind("<Down>", self._switch_filter)
+        self._root.bind("<Left>", self._kbd_switch_limit)
+        self._root.bind("<Right>", self._kbd_switch_limit)
+        self._root.bind("1", self._kbd_switch_desc)
+        self._root.bind("2", self._kbd_switch_desc)
+        self._root.bind("3", self._kbd_switch_desc)
+        for source in SOURCES.values():
+            self._root.bind(source.key, self._switch_inst)
+
+    def _build_menu(self, screen: Frame):
+        """Lays out the main game menu, once."""
 
         # Add logo, introduction, and prompt
         canvas = Canvas(
-            self.backdrop,
+            screen,
             bg=self._background,
             width=self._logo.width(),
             height=self._logo.height(),
@@ -161,7 +251,7 @@ class HammerPy(Frame):
 
         # Greeting
         Label(
-            self.backdrop,
+            screen,
             style="HammerPy.TLabel",
             font=("Helvetica Bold", 24),
             text="HammerPy",
@@ -169,39 +259,32 @@ class HammerPy(Frame):
 
         # Pack
         Label(
-            self.backdrop,
+            screen,
             style="HammerPy.TLabel",
             text="Please configure the game to your liking below and click Start or press Return",
         ).pack()
 
         # Institution selection
-        src_options = Frame(self.backdrop, style="HammerPy.TFrame")
+        src_options = Frame(screen, style="HammerPy.TFrame")
         src_options.pack()
 
         Label(src_options, style="HammerPy.TLabel", text="Institution:").grid(
             row=0, column=0, sticky="E"
         )
 
-        Radiobutton(
-            src_options,
-            text="Artsy",
-            variable=self._src,
-            command=self._switch_inst,
-            value=0,
-            style="HammerPy.TRadiobutton",
-        ).grid(row=0, column=1, sticky="W")
-
-        Radiobutton(
-            src_options,
-            text="Sotheby's",
-            variable=self._src,
-            command=self._switch_inst,
-            value=1,
-            style="HammerPy.TRadiobutton",
-        ).grid(row=0, column=2, sticky="W")
+        # one radio button per registered source
+        for column, (src, source) in enumerate(SOURCES.items(), start=1):
+            Radiobutton(
+                src_options,
+                text=source.name,
+                variable=self._src,
+                command=self._switch_inst,
+                value=src,
+                style="HammerPy.TRadiobutton",
+            ).grid(row=0, column=column, sticky="W")
 
         # Filtering selection
-        filter_options = Frame(self.backdrop, style="HammerPy.TFrame")
+        filter_options = Frame(screen, style="HammerPy.TFrame")
         filter_options.pack()
 
         self.filter_desc = Label(
@@ -211,6 +294,7 @@ class HammerPy(Frame):
         self.filter_box = Combobox(
             filter_options, textvariable=self._slug, state="readonly"
         )
+        self.filter_box.bind("<<ComboboxSelected>>", self._prefetch_selection)
         self._switch_inst()
         self.filter_box.current(0)
 
@@ -218,7 +302,7 @@ class HammerPy(Frame):
         self.filter_box.grid(row=0, column=1, sticky="W")
 
         # Amount of works to retrieve
-        work_options = Frame(self.backdrop, style="HammerPy.TFrame")
+        work_options = Frame(screen, style="HammerPy.TFrame")
         work_options.pack()
 
         Label(
@@ -236,7 +320,7 @@ class HammerPy(Frame):
             orient="horizontal",
             length=150,
             from_=1.0,
-            to=10.0,
+            to=float(self._artwork_limit),
             variable=self._limit,
             command=self._switch_limit,
         )
@@ -244,7 +328,7 @@ class HammerPy(Frame):
         self.quantity.grid(row=0, column=1)
         self.quantity_scale.grid(row=0, column=2)
 
-        diff_options = Frame(self.backdrop, style="HammerPy.TFrame")
+        diff_options = Frame(screen, style="HammerPy.TFrame")
         diff_options.pack()
 
         # Difficulty level
@@ -284,55 +368,53 @@ class HammerPy(Frame):
 
         # Add difficulty description and start game button
         self.diff_desc = Label(
-            self.backdrop, style="HammerPy.TLabel", text=self._descriptions[2]
+            screen,
+            style="HammerPy.TLabel",
+            text=self._descriptions[self.difficulty.get()],
         )
         self.diff_desc.pack()
 
         Button(
-            self.backdrop,
+            screen,
             command=self.collect_works,
             style="HammerPy.TButton",
             text="START",
         ).pack()
 
-        # Bind events directly to backdrop so user can press whatever without clicking to get focus
-        self._root.bind("q", self.quit_game)
-        self._root.bind("<Return>", self.collect_works)
-        self._root.bind("<Up>", self._switch_filter)
-        self._root.bind("<Down>", self._switch_filter)
-        self._root.bind("<Left>", self._kbd_switch_limit)
-        self._root.bind("<Right>", self._kbd_switch_limit)
-        self._root.bind("1", self._kbd_switch_desc)
-        self._root.bind("2", self._kbd_switch_desc)
-        self._root.bind("3", self._kbd_switch_desc)
-        self._root.bind("a", self._switch_inst)
-        self._root.bind("s", self._switch_inst)
-
     def _switch_inst(self, e=None):
-        """Switch between Medium/Category for Artsy/Sothebys"""
+        """Switch to the filters of the selected source."""
 
         if e:
-            self._src.set(e.keysym != "a")
+            self._src.set(next(src for src, s in SOURCES.items() if s.key == e.keysym))
 
-        if not self._src.get():
-            self.filter_box["values"] = [
-                m.name.capitalize().replace("_", " ") for m in Medium
-            ]
-        else:
-            self.filter_box["values"] = [c.name.capitalize() for c in Category]
+        self.filter_box["values"] = SOURCES[self._src.get()].labels()
 
         self.filter_box.current(0)
+        self._prefetch_selection()
 
     def _switch_filter(self, e):
         """Changes the set scraping filter."""
 
-        amount = 8 + self._src.get() * 3
+        amount = len(self.filter_box["values"])
         curr = self.filter_box.current()
         if e.keysym == "Down" and curr < amount - 1:
             self.filter_box.current(curr + 1)
         elif e.keysym == "Up" and curr > 0:
             self.filter_box.current(curr - 1)
 
+        self._prefetch_selection()
+
+    def _selection(self) -> tuple[int, str]:
+        """The source and filter slug currently selected in the menu."""
+
+        src = self._src.get()
+        return (src, SOURCES[src].slug(self._slug.get()))
+
+    def _prefetch_selection(self, _e=None):
+        """Have the inventory warm up the current selection first."""
+
+        self._inventory.prioritize(*self._selection())
+
     def _kbd_switch_desc(self, e):
         """For changing difficulty descriptions via keyboard nav."""
 
@@ -351,7 +433,7 @@ class HammerPy(Frame):
         current = self.quantity_scale.get()
         if e.keysym == "Left" and current > 1.0:
             self.quantity_scale.set(current - 1.0)
-        elif e.keysym == "Right" and current < 10.0:
+        elif e.keysym == "Right" and current < self._artwork_limit:
             self.quantity_scale.set(current + 1.0)
 
     def _switch_limit(self, _e=None):
@@ -363,90 +445,299 @@ class HammerPy(Frame):
         """Render game loading information on screen."""
 
         self._unbindall()
-        for widget in self.backdrop.winfo_children():
-            widget.destroy()
+        self._show("loading")
 
         self.action = self.stop_collecting
         self.redraw = self.draw_loading_screen
 
-        progbar_text = Label(self.backdrop, style="HammerPy.TLabel", text="Loading...")
-        progbar_text.pack(pady=10)
-
-        self.loading = Progressbar(
-            self.backdrop, length=540, value=0, maximum=self._limit.get() * 10
+        self.loading.configure(
+            value=len(self.works) * 10, maximum=self._limit.get() * 10
         )
-        self.loading.pack(pady=25)
+        self._update_overlay()
 
         self._root.bind("<Escape>", self.confirm_stop)
 
+    def _build_loading(self, screen: Frame):
+        """Lays out the loading screen, once."""
+
+        progbar_text = Label(screen, style="HammerPy.TLabel", text="Loading...")
+        progbar_text.pack(pady=10)
+
+        self.loading = Progressbar(screen, length=540)
+        self.loading.pack(pady=25)
+
         self._back = Button(
-            self.backdrop,
+            screen,
             command=self.confirm_stop,
             style="HammerPy.TButton",
             text="GO BACK",
         )
         self._back.pack()
 
+        if trace.OVERLAY:
+            self._overlay = Label(
+                screen,
+                style="HammerPy.TLabel",
+                font=("Courier", 11),
+                justify="left",
+            )
+            self._overlay.pack(pady=10)
+
+    def _update_overlay(self):
+        """Show how long each stage of the pipeline took so far, if asked for."""
+
+        if not trace.OVERLAY:
+            return
+
+        rows = [f"{'stage':<18}{'count':>6}{'avg ms':>9}{'max ms':>9}"]
+        rows += [
+            f"{name:<18}{count:>6}{avg:>9.1f}{longest:>9.1f}"
+            for name, count, avg, longest in trace.summary()
+        ]
+        self._overlay["text"] = "\n".join(rows)
+
     def collect_works(self, _e=None):
         """Get the"""
 
         self.works = []
+        self._playing = False
+        self._waiting = False
 
         q = Queue()
         limit = self._limit.get()
-        _src = self._src.get()
-
-        fn = scrape_artsy if not _src else scrape_sothebys
-        slug = self._slug.get().upper()
+        _src, slug = self._selection()
+        self._game = (_src, slug)
 
-        if not _src:
-            slug = Medium[slug.replace(" ", "_")].value
+        # the backend is usually loaded already, by the inventory warming it up
+        fn = sources.load(_src)
 
         self.draw_loading_screen()
 
-        self._scraper = Scraper(q, limit, _src, slug, fn)
-        self._scraper.start()
-
-        t = Thread(target=update_status, daemon=True, args=(self, q))
+        # works prefetched in the background go straight to the game, then
+        # works from the local catalog, only the shortfall has to be scraped now
+        ready = self._inventory.take(_src, slug, limit)
+        ready += self._catalog.pick(
+            _src,
+            slug,
+            limit - len(ready),
+            exclude=[work.image_url for work, _ in ready],
+        )
+        for item in ready:
+            q.put_nowait(item)
+        limit -= len(ready)
+
+        if not limit:
+            self._scraper = None
+            q.put_nowait(None)
+        elif ENGINE == "asyncio":
+            # imported here so the event loop engine is only loaded when asked for
+            from hammerpy.aio import AsyncScraper
+
+            self._scraper = AsyncScraper(
+                q, limit, _src, slug, fn, catalog=self._catalog
+            )
+        else:
+            self._scraper = Scraper(q, limit, _src, slug, fn, catalog=self._catalog)
+
+        if self._scraper:
+            # the game gets the sites to itself until it has all its works
+            self._inventory.pause()
+            self._scraper.start()
+
+        # the worker thread only ever hands plain images to the main loop,
+        # every Tk object is created by _drain_prepared
+        self._ready = Queue()
+        t = Thread(
+            target=prepare_works,
+            daemon=True,
+            args=(q, self._ready, self._disp_height()),
+        )
         t.start()
+        self.after(DRAIN_INTERVAL, self._drain_prepared, self._ready)
+
+    def _disp_height(self) -> int:
+        """Height of the image on the guess screen."""
+
+        return self.height - 200
+
+    def _prefetch(self, index: int):
+        """Start preparing the renditions of a work and the few after it.
+
+        Works out of that window are forgotten here, whatever of them is
+        still in the rendition cache is found there again.
+        """
+
+        upcoming = [w.path for w in self.works[index : index + PREFETCH_AHEAD + 1]]
+        self._renditions = {
+            image_path: self._renditions.get(image_path)
+            or images.submit(image_path, self._disp_height())
+            for image_path in upcoming
+        }
+
+    def _when_prepared(
+        self,
+        screen: str,
+        review: bool,
+        show: Callable[[Guesswork, ImageTk.PhotoImage | None], None],
+    ):
+        """Create the guess (or review) image of the work on screen, then show it.
+
+        The main loop never waits on a worker: until the renditions are ready
+        this checks back every DRAIN_INTERVAL, while the next works are
+        prepared too. Only the images on screen are kept alive, so memory
+        doesn't grow with the size of the game.
+        """
+
+        work = self.works[self.active_guess]
+        self._prefetch(self.active_guess)
+        self._poll_prepared(work, self._renditions[work.path], screen, review, show)
+
+    def _poll_prepared(
+        self,
+        work: Guesswork,
+        future: Future,
+        screen: str,
+        review: bool,
+        show: Callable[[Guesswork, ImageTk.PhotoImage | None], None],
+    ):
+        """Show a work's image once its renditions are ready, see _when_prepared."""
+
+        # the player moved on or left the screen in the meantime
+        if (
+            self._shown != screen
+            or self.active_guess >= len(self.works)
+            or self.works[self.active_guess] is not work
+        ):
+            return
+
+        if not future.done():
+            self.after(
+                DRAIN_INTERVAL, self._poll_prepared, work, future, screen, review, show
+            )
+            return
+
+        try:
+            renditions = future.result()
+        except Exception as err:  # pylint: disable=broad-except
+            # unreadable after all (truncated, a dead worker...), show shows nothing
+            print(f"Skipping {work.path}: {err}")
+            show(work, None)
+            return
+
+        with trace.span("tk.photoimage"):
+            photo = ImageTk.PhotoImage(image=renditions[review])
+        show(work, photo)
+
+    def _drain_prepared(self, ready: Queue):
+        """Turn prepared works into Guessworks, a few per tick so the UI stays responsive."""
+
+        # a game that was abandoned stops draining
+        if ready is not self._ready:
+            return
+
+        start = perf_counter()
+        deadline = start + DRAIN_BUDGET
+        drained = 0
+        while perf_counter() < deadline:
+            try:
+                item = ready.get_nowait()
+            except Empty:
+                break
+
+            if not item:
+                self._collected()
+                return
+
+            self.works.append(make_guesswork(self, *item))
+            drained += 1
+
+        # idle ticks aren't recorded, they'd bury the ones that did something
+        if drained:
+            trace.add("tk.drain", start, perf_counter() - start, works=drained)
+
+        if self.works and not self._playing:
+            # the game starts with the first work, the rest keep arriving meanwhile
+            self._playing = True
+            self.start_game()
+        elif self._waiting and self.active_guess < len(self.works):
+            # the player caught up with the pipeline and the next work is here
+            self._waiting = False
+            self.redraw = self.add_artwork
+            self.add_artwork()
+        elif self._shown == "loading":
+            self.loading["value"] = len(self.works) * 10
+            self._update_overlay()
+
+        self.after(DRAIN_INTERVAL, self._drain_prepared, ready)
+
+    def _collected(self):
+        """Every work has been prepared, wrap up whatever screen is waiting on more."""
+
+        self._ready = None
+        self._inventory.resume()
+
+        if not self.works:
+            print("No works could be collected")
+            self.draw_main_menu()
+        elif not self._playing:
+            self._playing = True
+            self.start_game()
+        elif self._waiting:
+            self._waiting = False
+            self.draw_results_screen()
+        elif self.active_guess == len(self.works) - 1 and self._shown == "guess":
+            # the work on screen turned out to be the last one
+            self.answer["text"] = "FINISH"
 
     def stop_collecting(self, _e=None):
         """Stop the scraper."""
 
-        self._scraper.stop()
+        if self._scraper:
+            self._scraper.stop()
+        if self._ready:
+            # the works still on their way are never played, so let their images go
+            Thread(target=release_works, daemon=True, args=(self._ready,)).start()
+        self._ready = None
+        self._inventory.resume()
         self.draw_main_menu()
 
     def confirm_stop(self, _e=None):
         """Confirm that the user wants to terminate the scraping routine early."""
 
         self._unbindall()
-        for widget in self.backdrop.winfo_children():
-            widget.destroy()
+        self._show("confirm")
 
-        self.loading = Label(
-            self.backdrop, style="HammerPy.TLabel", text="Return to main menu?\n"
-        )
-        self.loading.pack()
+        self._root.bind("<Return>", lambda _e: self.action())
+        self._root.bind("<Escape>", lambda _e: self.redraw())
+
+    def _build_confirm(self, screen: Frame):
+        """Lays out the confirmation prompt, once."""
 
+        Label(screen, style="HammerPy.TLabel", text="Return to main menu?\n").pack()
+
+        # action and redraw change with the screen that asked, so look them up on click
         self._yes = Button(
-            self.backdrop, command=self.action, style="HammerPy.TButton", text="YES"
+            screen,
+            command=lambda: self.action(),
+            style="HammerPy.TButton",
+            text="YES",
         )
         self._yes.pack(side="left", padx=25)
 
         self._no = Button(
-            self.backdrop, command=self.redraw, style="HammerPy.TButton", text="NO"
+            screen,
+            command=lambda: self.redraw(),
+            style="HammerPy.TButton",
+            text="NO",
         )
         self._no.pack(side="right")
 
-        self._root.bind("<Return>", self.action)
-        self._root.bind("<Escape>", self.redraw)
-
     def start_game(self):
         """Begin game!"""
 
-        # self._limit = len(self.works)
         self.active_guess = 0
-        self.action = self.draw_main_menu
+        # leaving mid-game also stops the works still being collected
+        self.action = self.stop_collecting
         self.redraw = self.add_artwork
 
         self.add_artwork()
@@ -454,12 +745,77 @@ class HammerPy(Frame):
     def add_artwork(self):
         """Add an artwork to the guessing block."""
 
-        for widget in self.backdrop.winfo_children():
-            widget.destroy()
+        self._unbindall()
+        self._show("guess")
+
+        art = self.works[self.active_guess]
+
+        # msg only displays something on error
+        self.errmsg["text"] = ""
+        self.art_view.configure(width=art.disp_width, height=art.disp_height)
+
+        # the previous work's image isn't needed again until the results
+        if self.active_guess:
+            self.works[self.active_guess - 1].disp_img = None
+
+        self.guess_value.set("")
+        self.guess_entry.focus_force()
+
+        if art.disp_img:
+            self._show_artwork(art, art.disp_img)
+        else:
+            # no guessing blind, the image is usually prepared already anyway
+            self.art_view.itemconfigure(self._art_item, image="")
+            self.answer.configure(state="disabled")
+            self._when_prepared("guess", False, self._show_artwork)
+
+    def _show_artwork(self, art: Guesswork, photo: ImageTk.PhotoImage | None):
+        """Put a work's image on the guessing block and let the player guess."""
+
+        if not photo:
+            self._skip_artwork(art)
+            return
+
+        art.disp_img = photo
+        self.art_view.itemconfigure(self._art_item, image=photo)
+
+        # last item's button should say FINISH to conclude game, unless
+        # more works may still arrive
+        last = self.active_guess == self._limit.get() - 1 or (
+            not self._ready and self.active_guess == len(self.works) - 1
+        )
+        self.answer.configure(text="FINISH" if last else "NEXT", state="normal")
+
+    def _skip_artwork(self, art: Guesswork):
+        """Drop a work whose image turned out to be unreadable, the game is one work short."""
+
+        self.works.remove(art)
+        image_cache.release(art.path)
+        self._next_artwork()
+
+    def _next_artwork(self):
+        """Show the work at active_guess, or the results if that was the last one."""
+
+        if self.active_guess < len(self.works):
+            self.add_artwork()
+        elif not self._ready or self.active_guess == self._limit.get():
+            if not self.works:
+                print("No works could be collected")
+                self.draw_main_menu()
+                return
+            self.works[-1].disp_img = None
+            self.draw_results_screen()
+        else:
+            # the player is ahead of the downloads, wait for the next work
+            self._waiting = True
+            self.draw_loading_screen()
+
+    def _build_guess(self, screen: Frame):
+        """Lays out the guessing block, once."""
 
         # msg only displays something on error, but it is still packed first
         self.errmsg = Label(
-            self.backdrop,
+            screen,
             style="HammerPy.TLabel",
             foreground="#ff384c",
             text="",
@@ -467,13 +823,12 @@ class HammerPy(Frame):
         )
         self.errmsg.pack()
 
-        art = self.works[self.active_guess]
+        # the canvas is resized and its image swapped for every work
+        self.art_view = Canvas(screen)
+        self._art_item = self.art_view.create_image((0, 0), anchor="nw")
+        self.art_view.pack()
 
-        canvas = Canvas(self.backdrop, width=art.disp_width, height=art.disp_height)
-        canvas.create_image((0, 0), image=art.disp_img, anchor="nw")
-        canvas.pack()
-
-        price_entry = Frame(self.backdrop, style="HammerPy.TFrame")
+        price_entry = Frame(screen, style="HammerPy.TFrame")
         price_entry.pack(expand=True)
 
         directions = Label(
@@ -497,18 +852,13 @@ class HammerPy(Frame):
             foreground="black",
         )
         self.guess_entry.bind("<Return>", self.log_guess)
-        self.guess_entry.focus_force()
         self.guess_entry.grid(row=0, column=1, pady=25)
 
-        # last item's button should say FINISH to conclude game
-        button_text = (
-            "NEXT" if not self.active_guess == self._limit.get() - 1 else "FINISH"
-        )
         self.answer = Button(
             price_entry,
             command=self.log_guess,
             style="HammerPy.TButton",
-            text=button_text,
+            text="NEXT",
         )
         self.answer.grid(row=1, column=0, sticky="w")
 
@@ -523,6 +873,10 @@ class HammerPy(Frame):
     def log_guess(self, _e=None):
         """Record a user's price estimation."""
 
+        # Return still reaches the entry while the image is on its way
+        if self.answer.instate(["disabled"]):
+            return
+
         self.answer.config(state="disabled")
         guess = self.guess_value.get().strip()
 
@@ -531,10 +885,7 @@ class HammerPy(Frame):
             self.works[self.active_guess].guess = int(guess)
 
             self.active_guess += 1
-            if self.active_guess == len(self.works):
-                self.draw_results_screen()
-            else:
-                self.add_artwork()
+            self._next_artwork()
         else:
             self.errmsg["text"] = "Guess must be numeric characters [0-9] only"
             self.answer.config(state="normal")
@@ -543,16 +894,31 @@ class HammerPy(Frame):
         """This is it! Show the user how they performed!"""
 
         self._unbindall()
-        for widget in self.backdrop.winfo_children():
-            widget.destroy()
+        self._show("results")
 
         self.active_guess = 0
 
+        self.action = self.draw_main_menu
+        self.redraw = self.draw_results_screen
+
+        # a previous game may have left the button on FINISH
+        self.next_button.configure(text="NEXT", command=self.next_result)
+
+        self.switch_result()
+
+    def _build_results(self, screen: Frame):
+        """Lays out the results screen, once."""
+
         # split screen into 2 halves:
-        self.art_canvas = Frame(self.backdrop, style="HammerPy.TFrame", padding=20)
+        self.art_canvas = Frame(screen, style="HammerPy.TFrame", padding=20)
         self.art_canvas.pack(side="left")
 
-        self.art_results = Frame(self.backdrop, style="HammerPy.TFrame", padding=20)
+        # the canvas is resized and its image swapped for every result
+        self.review_view = Canvas(self.art_canvas)
+        self._review_item = self.review_view.create_image((0, 0), anchor="nw")
+        self.review_view.pack()
+
+        self.art_results = Frame(screen, style="HammerPy.TFrame", padding=20)
         self.art_results.pack(side="right")
 
         # instead of having multiple labels to update for all these items
@@ -606,9 +972,6 @@ class HammerPy(Frame):
         continue_options = Frame(self.art_results, style="HammerPy.TFrame")
         continue_options.pack()
 
-        self.action = self.draw_main_menu
-        self.redraw = self.draw_results_screen
-
         self.next_button = Button(
             continue_options,
             command=self.next_result,
@@ -625,32 +988,33 @@ class HammerPy(Frame):
         )
         exit_button.grid(row=0, column=1, sticky="e")
 
-        self.switch_result()
-
     def next_result(self):
         """Move to the next result, and print info on screen."""
 
-        if self.active_guess + 1 < self._limit.get():
+        if self.active_guess + 1 < len(self.works):
             self.active_guess += 1
             self.switch_result()
 
     def switch_result(self):
         """Generic function for switching to a given Guesswork result."""
 
-        if self.art_canvas.winfo_children():
-            self.art_canvas.winfo_children()[0].destroy()
-
+        previous = self.curr_work
         self.curr_work = self.works[self.active_guess]
 
         self.keep_yes["variable"] = self.keep_no["variable"] = self.curr_work.keep
 
-        canvas = Canvas(
-            self.art_canvas,
-            width=self.curr_work.review_width,
-            height=self.curr_work.review_height,
+        self.review_view.configure(
+            width=self.curr_work.review_width, height=self.curr_work.review_height
         )
-        canvas.create_image((0, 0), image=self.curr_work.review_img, anchor="nw")
-        canvas.pack()
+        if self.curr_work.review_img:
+            self._show_review(self.curr_work, self.curr_work.review_img)
+        else:
+            self.review_view.itemconfigure(self._review_item, image="")
+            self._when_prepared("results", True, self._show_review)
+
+        # only the result on screen keeps its image
+        if previous and previous is not self.curr_work:
+            previous.review_img = None
 
         # compute all values needed for template string to show user's results
         title = self.curr_work.art.title
@@ -696,10 +1060,16 @@ class HammerPy(Frame):
         else:
             self.user_guess["foreground"] = self._failure_color
 
-        if self.active_guess == self._limit.get() - 1:
+        if self.active_guess == len(self.works) - 1:
             self.next_button["text"] = "FINISH"
             self.next_button["command"] = self.draw_main_menu
 
+    def _show_review(self, work: Guesswork, photo: ImageTk.PhotoImage | None):
+        """Put a work's image next to its result, the result stands without it."""
+
+        work.review_img = photo
+        self.review_view.itemconfigure(self._review_item, image=photo or "")
+
     def _unbindall(self):
         """Stop listening to all keyboard functions."""
 
@@ -707,8 +1077,8 @@ class HammerPy(Frame):
         self._root.unbind("2")
         self._root.unbind("3")
         self._root.unbind("q")
-        self._root.unbind("a")
-        self._root.unbind("s")
+        for source in SOURCES.values():
+            self._root.unbind(source.key)
         self._root.unbind("<Escape>")
         self._root.unbind("<Return>")
         self._root.unbind("<Up>")
@@ -717,53 +1087,69 @@ class HammerPy(Frame):
         self._root.unbind("<Right>")
 
 
-# separate function in separate thread from HammerPy
-# because main thread must run GUI
-def update_status(h: HammerPy, q: Queue):
-    """Runs the scraping routine, updates user on collection status."""
+def make_guesswork(h: HammerPy, item: tuple, sizes: tuple) -> Guesswork:
+    """Wrap a downloaded work and the sizes of its renditions for the game."""
 
-    disp_height = h.height - 200
+    work, save_path = item
+    (disp_width, disp_height), (review_width, review_height) = sizes
     factor = 0.05 + (0.1 * h.difficulty.get())
 
-    while True:
-        try:
-            item = q.get()
-        except Empty:
-            continue
-
-        if not item:
-            break
-
-        # determine other properties for this work and construct Guesswork object
-        work, save_path = item
-
-        # determine dimensions for showing image in guess and result screens
-        # IF THE IMAGE OBJECT ISN'T READ ALL AT ONCE HERE IT DOESN'T LOAD
-        with Image.open(save_path) as img:
-            width = img.width
-            height = img.height
-            disp_width = float(float(width) / float(height)) * float(disp_height)
-            review_height = 500.0 / (float(width) / float(height))
-
-        keep = IntVar()
-        keep.set(0)
-
-        guess_work = Guesswork(
-            work,
-            save_path,
-            ImageTk.PhotoImage(image=img.resize((ceil(disp_width), disp_height))),
-            ImageTk.PhotoImage(image=img.resize((500, ceil(review_height)))),
-            ceil(disp_width),
-            disp_height,
-            500,
-            ceil(review_height),
-            floor(work.prices[0] * (1.0 - factor)),
-            floor(work.prices[-1] * (1.0 + factor)),
-            keep,
-        )
-
-        h.works.append(guess_work)
-        h.loading["value"] = len(h.works) * 10
-
-    # Queue has been read in full, start the actual guessing game
-    h.start_game()
+    keep = IntVar()
+    keep.set(0)
+
+    return Guesswork(
+        work,
+        save_path,
+        disp_width,
+        disp_height,
+        review_width,
+        review_height,
+        floor(work.prices[0] * (1.0 - factor)),
+        floor(work.prices[-1] * (1.0 + factor)),
+        keep,
+    )
+
+
+# separate function in separate thread from HammerPy
+# because main thread must run GUI
+def prepare_works(q: Queue, ready: Queue, disp_height: int):
+    """Turns downloaded works into (item, rendition sizes) pairs for the main loop.
+
+    Every image's header is read up front, which sizes its views and drops
+    most unreadable works. The first works are prepared in full too, as many
+    as half the rendition cache holds, the rest are prefetched by the game
+    shortly before they're shown. Tk objects are never touched here.
+    """
+
+    budget = RENDITION_CACHE_BYTES // 2
+
+    try:
+        while item := q.get():
+            try:
+                sizes = probe(item[1], disp_height)
+            except Exception as err:  # pylint: disable=broad-except
+                # an unreadable image (corrupt, a decompression bomb...) just
+                # leaves the game one work short
+                print(f"Skipping {item[1]}: {err}")
+                image_cache.release(item[1])
+                continue
+
+            # both renditions are RGB, which Pillow keeps at four bytes a pixel
+            cost = sum(4 * width * height for width, height in sizes)
+            if cost <= budget:
+                # decoded and scaled in worker processes, several at once
+                budget -= cost
+                images.submit(item[1], disp_height)
+
+            ready.put_nowait((item, sizes))
+    finally:
+        # Queue has been read in full, or this thread failed, either way the
+        # main loop mustn't wait for more
+        ready.put_nowait(None)
+
+
+def release_works(ready: Queue):
+    """Lets go of the images of an abandoned game's works, as prepare_works hands them over."""
+
+    while item := ready.get():
+        image_cache.release(item[0][1])
@@ -0,0 +1,220 @@
+"""Headless bulk harvest: fills the local catalog with works from every source and filter.
+
+Run from the project root, e.g. overnight:
+
+    python hammer.py harvest --works 200 --jobs 4
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from queue import Queue
+from threading import Lock
+from time import perf_counter
+
+from hammerpy import sources, trace
+from hammerpy.catalog import Catalog
+from hammerpy.imagecache import image_cache
+from hammerpy.sources import SOURCES
+from hammerpy.util import DOWNLOAD_WORKERS, ScrapeStats, Scraper
+
+# how many works are harvested per filter by default
+HARVEST_WORKS = 50
+
+# how many filters are harvested at the same time by default
+HARVEST_JOBS = 2
+
+
+@dataclass
+class HarvestReport:
+    """Totals over every filter of a harvest."""
+
+    stats: ScrapeStats = field(default_factory=ScrapeStats)
+    new: int = 0  # works the catalog didn't have before
+    filters: int = 0
+    failed_filters: int = 0
+    seconds: float = 0.0
+
+    def print(self):
+        """Print the totals and the throughput they amount to."""
+
+        attempts = self.stats.works + self.stats.failed
+        seconds = self.seconds or 1e-9
+        print(f"filters harvested:  {self.filters} ({self.failed_filters} failed)")
+        print(f"works harvested:    {self.stats.works} ({self.new} new in the catalog)")
+        print(f"already on disk:    {self.stats.cached}")
+        print(
+            f"failed downloads:   {self.stats.failed}"
+            f" ({self.stats.failed / (attempts or 1):.1%} of attempts)"
+        )
+        print(f"bytes downloaded:   {self.stats.bytes / 1e6:.1f} MB")
+        print(f"elapsed:            {self.seconds:.1f} s")
+        print(
+            f"throughput:         {self.stats.works / seconds:.2f} works/s,"
+            f" {self.stats.bytes / 1e6 / seconds:.2f} MB/s"
+        )
+
+
+class Harvester:
+    """Runs one Scraper per (source, filter) straight into the catalog, no GUI involved."""
+
+    def __init__(
+        self,
+        catalog: Catalog,
+        works: int = HARVEST_WORKS,
+        jobs: int = HARVEST_JOBS,
+        workers: int = DOWNLOAD_WORKERS,
+    ):
+        self.catalog = catalog
+        self.works = works
+        self.jobs = jobs
+        self.workers = workers
+        self.report = HarvestReport()
+        self._scrapers = []
+        self._running = True
+        self._lock = Lock()
+
+    def stop(self):
+        """Stop every scraper, e.g. on Ctrl+C."""
+
+        self._running = False
+        with self._lock:
+            for scraper in self._scrapers:
+                scraper.stop()
+
+    def _harvest(self, src: int, slug: str):
+        """Scrape one filter on this thread, leaving its images to the cache."""
+
+        if not self._running:
+            return
+
+        before = self.catalog.count(src, slug)
+        q = Queue()
+        scraper = Scraper(
+            q,
+            self.works,
+            src,
+            slug,
+            sources.load(src),
+            workers=self.workers,
+            catalog=self.catalog,
+        )
+        with self._lock:
+            self._scrapers.append(scraper)
+
+        failed = False
+        try:
+            scraper.run()
+        except Exception as err:  # pylint: disable=broad-except
+            # a broken filter shouldn't cost the whole night
+            print(f"{SOURCES[src].name} {slug or 'ALL'}: failed, {err}")
+            failed = True
+        finally:
+            # nobody plays these now, the catalog finds them in the cache later
+            while not q.empty():
+                if item := q.get_nowait():
+                    image_cache.release(item[1])
+
+        with self._lock:
+            self._scrapers.remove(scraper)
+            self.report.filters += 1
+            self.report.failed_filters += failed
+            self.report.stats.works += scraper.stats.works
+            self.report.stats.cached += scraper.stats.cached
+            self.report.stats.failed += scraper.stats.failed
+            self.report.stats.bytes += scraper.stats.bytes
+            self.report.new += self.catalog.count(src, slug) - before
+
+        print(
+            f"{SOURCES[src].name} {slug or 'ALL'}: {scraper.stats.works} works,"
+            f" {scraper.stats.failed} unavailable"
+        )
+
+    def run(self, targets: list[tuple[int, str]]) -> HarvestReport:
+        """Harvest every (source, filter) pair, `jobs` of them at a time."""
+
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            for src, slug in targets:
+                pool.submit(self._harvest, src, slug)
+
+            try:
+                pool.shutdown(wait=True)
+            except KeyboardInterrupt:
+                print("Stopping, the works downloaded so far are kept...")
+                self.stop()
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        self.report.seconds = perf_counter() - start
+        return self.report
+
+
+def main(argv: list[str] | None = None):
+    """Parse the command line and run a harvest."""
+
+    # mixed games read from the other sources, so there's nothing to harvest for them
+    harvestable = {
+        src: source for src, source in SOURCES.items() if not source.composite
+    }
+
+    parser = ArgumentParser(
+        prog="hammer.py harvest", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        choices=[source.key for source in harvestable.values()],
+        default=[source.key for source in harvestable.values()],
+        help="sources to harvest, by menu shortcut (default: all)",
+    )
+    parser.add_argument(
+        "--filters",
+        nargs="+",
+        metavar="FILTER",
+        help="filter names to harvest, e.g. painting (default: all)",
+    )
+    parser.add_argument(
+        "--works",
+        type=int,
+        default=HARVEST_WORKS,
+        help=f"works to download per filter (default: {HARVEST_WORKS})",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=HARVEST_JOBS,
+        help=f"filters harvested at the same time (default: {HARVEST_JOBS})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DOWNLOAD_WORKERS,
+        help=f"image downloads per filter at once (default: {DOWNLOAD_WORKERS})",
+    )
+    args = parser.parse_args(argv)
+
+    wanted = {name.upper().replace(" ", "_") for name in args.filters or []}
+    targets = [
+        (src, source.slug(label))
+        for src, source in harvestable.items()
+        if source.key in args.sources
+        for label in source.labels()
+        if not wanted or label.upper().replace(" ", "_") in wanted
+    ]
+    if not targets:
+        parser.error("no filter matches")
+
+    catalog = Catalog()
+    harvester = Harvester(catalog, args.works, args.jobs, args.workers)
+    try:
+        report = harvester.run(targets)
+    finally:
+        sources.shutdown()
+        catalog.close()
+        trace.export()
+
+    report.print()
+
+
+if __name__ == "__main__":
+    main()
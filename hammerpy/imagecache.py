@@ -0,0 +1,199 @@
+"""Content-addressed on-disk cache of work images, bounded by a disk budget."""
+
+from collections import Counter
+from datetime import date
+from hashlib import sha1
+from json import dumps, load
+from os import environ, link, makedirs, path, remove, replace, scandir, utime
+from shutil import copyfile
+from threading import Lock, get_ident
+
+from hammerpy.util import CACHE_DIR, Guesswork, cleanse
+
+IMAGES_DIR = f"{CACHE_DIR}/images"
+
+# total size of cached images before the least recently used ones are evicted,
+# set HAMMERPY_IMAGE_CACHE_MB to change it
+IMAGE_CACHE_BYTES = int(environ.get("HAMMERPY_IMAGE_CACHE_MB", "1024")) * 1024**2
+
+
+def link_or_copy(src: str, dst: str):
+    """Hard link a file (free, and survives the original being removed), else copy it."""
+
+    try:
+        link(src, dst)
+    except OSError:
+        copyfile(src, dst)
+
+
+class ImageCache:
+    """Images stored under a hash of their URL, so each one is downloaded only once.
+
+    Images in use by a game or the inventory are held for the session, and
+    images the player kept are pinned for good. Neither is ever evicted.
+    """
+
+    def __init__(self, directory: str = IMAGES_DIR, max_bytes: int = IMAGE_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._held = Counter()  # path -> how many owners are using it
+        self._pinned = None  # names of kept images, loaded on first use
+        self._total = None  # bytes cached, counted on first use
+        self._lock = Lock()
+
+    def file_for(self, url: str) -> str:
+        """Where the image of a URL is stored."""
+
+        return f"{self.directory}/{sha1(url.encode('utf8')).hexdigest()}.jpg"
+
+    def lookup(self, url: str, hold: bool = False) -> str | None:
+        """The cached image of a URL, marking it as recently used.
+
+        With hold, it's also held in the same step, so an eviction can't
+        remove it before the caller gets to hold it.
+        """
+
+        image_path = self.file_for(url)
+        with self._lock:
+            try:
+                utime(image_path)
+            except OSError:
+                return None
+
+            if hold:
+                self._held[image_path] += 1
+
+        return image_path
+
+    def download(self, url: str, hold: bool = False) -> str | None:
+        """Fetch an image into the cache. Returns None if it's unavailable.
+
+        With hold, it's held before it's even written, see lookup.
+        """
+
+        # imported here so starting the game doesn't wait on requests being loaded
+        from hammerpy.net import fetch_image
+
+        makedirs(self.directory, exist_ok=True)
+        image_path = self.file_for(url)
+        if hold:
+            self.hold(image_path)
+
+        saved = False
+        try:
+            saved = fetch_image(url, image_path)
+        finally:
+            if hold and not saved:
+                self.release(image_path)
+
+        if not saved:
+            return None
+
+        self.admit(image_path)
+        return image_path
+
+    def admit(self, image_path: str):
+        """Account for an image just written to the cache, evicting others if needed."""
+
+        with self._lock:
+            if self._total is None:
+                return self._evict()
+            self._total += path.getsize(image_path)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def hold(self, image_path: str):
+        """Protect an image from eviction while it's in use."""
+
+        with self._lock:
+            self._held[image_path] += 1
+
+    def release(self, image_path: str):
+        """Let an image be evicted again once nobody is using it."""
+
+        with self._lock:
+            self._held[image_path] -= 1
+            if self._held[image_path] <= 0:
+                del self._held[image_path]
+
+    def _pins_file(self) -> str:
+        """Path of the file that remembers the pinned images."""
+
+        return f"{self.directory}/pins.json"
+
+    def _pins(self) -> set[str]:
+        """Names of the pinned images, call with the lock held."""
+
+        if self._pinned is None:
+            try:
+                with open(self._pins_file(), encoding="utf8") as file:
+                    self._pinned = set(load(file))
+            except (OSError, ValueError):
+                self._pinned = set()
+
+        return self._pinned
+
+    def pin(self, image_path: str):
+        """Never evict an image, e.g. because the player kept it."""
+
+        with self._lock:
+            pinned = self._pins()
+            if path.basename(image_path) in pinned:
+                return
+            pinned.add(path.basename(image_path))
+
+            makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._pins_file()}.{get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf8") as file:
+                file.write(dumps(sorted(pinned)))
+            replace(tmp_path, self._pins_file())
+
+    def _evict(self):
+        """Drop least recently used images until the cache fits, call with the lock held."""
+
+        protected = self._pins() | {path.basename(held) for held in self._held}
+
+        cached = []
+        self._total = 0
+        for entry in scandir(self.directory):
+            if entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                self._total += stat.st_size
+                if entry.name not in protected:
+                    cached.append((stat.st_mtime, stat.st_size, entry.path))
+
+        cached.sort()
+        while self._total > self.max_bytes and cached:
+            _, size, image_path = cached.pop(0)
+            self._total -= size
+            try:
+                remove(image_path)
+            except FileNotFoundError:
+                pass
+
+
+# shared by every scraper in the session
+image_cache = ImageCache()
+
+
+def finish_works(works: list[Guesswork]):
+    """Hand a finished game's images back to the cache.
+
+    Kept images are pinned, and linked into a folder for the day under their
+    title so they're easy to find.
+    """
+
+    for w in works:
+        if w.keep.get() and path.isfile(w.path):
+            image_cache.pin(w.path)
+
+            keep_dir = f"img/{date.today()}"
+            makedirs(keep_dir, exist_ok=True)
+            keep_path = f"{keep_dir}/{cleanse(w.art.title)}.jpg"
+            if path.exists(keep_path) and not path.samefile(keep_path, w.path):
+                # another kept work has the same title, so tell them apart by hash
+                keep_path = f"{keep_path[:-4]} {path.basename(w.path)[:8]}.jpg"
+            if not path.exists(keep_path):
+                link_or_copy(w.path, keep_path)
+
+        image_cache.release(w.path)
@@ -0,0 +1,193 @@
+"""Prepares the guess and review renditions of a downloaded work in worker processes."""
+
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from math import ceil
+from multiprocessing import get_context
+from threading import Lock
+from time import perf_counter
+
+from PIL import Image, ImageMode
+
+from hammerpy import trace
+
+# number of processes decoding images, each one takes a whole work off Tk's hands
+IMAGE_WORKERS = 2
+
+# width of the image shown next to the results
+REVIEW_WIDTH = 500
+
+# pixel bytes of prepared renditions kept in memory, a work takes about 3 MB
+RENDITION_CACHE_BYTES = 128 * 1024 * 1024
+
+
+def rendition_sizes(
+    width: int, height: int, disp_height: int
+) -> tuple[tuple[int, int], tuple[int, int]]:
+    """Sizes of the guess view (fixed height) and the review view (fixed width)."""
+
+    ratio = width / height
+    return (
+        (ceil(ratio * disp_height), disp_height),
+        (REVIEW_WIDTH, ceil(REVIEW_WIDTH / ratio)),
+    )
+
+
+def probe(save_path: str, disp_height: int) -> tuple[tuple[int, int], tuple[int, int]]:
+    """Sizes of an image's renditions, read from its header alone.
+
+    Unreadable and oversized images fail here already, a truncated one only
+    once it's prepared.
+    """
+
+    with Image.open(save_path) as img:
+        return rendition_sizes(img.width, img.height, disp_height)
+
+
+def prepare(save_path: str, disp_height: int) -> tuple[Image.Image, Image.Image]:
+    """Decode an image once and scale it down to both renditions.
+
+    JPEGs are decoded at a reduced scale that's still at least as large as the
+    biggest rendition, which skips most of the work for multi-megapixel scans.
+    """
+
+    with Image.open(save_path) as img:
+        disp_size, review_size = rendition_sizes(img.width, img.height, disp_height)
+        img.draft(
+            "RGB",
+            (max(disp_size[0], review_size[0]), max(disp_size[1], review_size[1])),
+        )
+        img = img.convert("RGB")
+
+    return (img.resize(disp_size), img.resize(review_size))
+
+
+def pixel_bytes(img: Image.Image) -> int:
+    """Memory taken by an image's pixels, which depends on its mode's sample type."""
+
+    mode = ImageMode.getmode(img.mode)
+    # typestr ends in the size of one sample, e.g. "|u1", "<u2" or "<f4"
+    sample = int(mode.typestr[-1])
+    # Pillow keeps 8-bit pixels of more than one band in 4 bytes, RGB too
+    pixel = 4 if sample == 1 and len(mode.bands) > 1 else len(mode.bands) * sample
+    return img.width * img.height * pixel
+
+
+class RenditionCache:
+    """Prepared renditions by image and view height, least recently used dropped first.
+
+    Images are content-addressed on disk, so their path identifies them.
+    """
+
+    def __init__(self, max_bytes: int = RENDITION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (path, height) -> (renditions, bytes)
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, key: tuple[str, int]) -> tuple[Image.Image, Image.Image] | None:
+        """The renditions prepared for a key, if they're still around."""
+
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key: tuple[str, int], renditions: tuple[Image.Image, Image.Image]):
+        """Remember renditions, dropping the least recently used beyond the budget."""
+
+        size = sum(pixel_bytes(img) for img in renditions)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (renditions, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self._bytes -= dropped
+
+    def clear(self):
+        """Forget every rendition."""
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# shared by every screen and game in the session
+renditions = RenditionCache()
+
+
+class ImagePool:
+    """Process pool for `prepare`, started on first use.
+
+    Renditions prepared before come straight from the rendition cache, and
+    an image that's being prepared already isn't queued a second time.
+    """
+
+    def __init__(self, workers: int = IMAGE_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._in_flight = {}  # (path, height) -> its preparation
+        self._lock = Lock()
+
+    def submit(self, save_path: str, disp_height: int) -> Future:
+        """Prepare the renditions of an image in a worker process."""
+
+        key = (save_path, disp_height)
+        if cached := renditions.get(key):
+            future = Future()
+            future.set_result(cached)
+            return future
+
+        with self._lock:
+            if future := self._in_flight.get(key):
+                return future
+
+            if not self._executor:
+                # forking a threaded Tk process can deadlock the child, so start fresh ones
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=get_context("spawn")
+                )
+            future = self._executor.submit(prepare, save_path, disp_height)
+            self._in_flight[key] = future
+
+        if trace.ENABLED:
+            # measured from submission, so time spent queued for a worker counts too
+            start = perf_counter()
+            future.add_done_callback(
+                lambda _: trace.add(
+                    "image.prepare", start, perf_counter() - start, path=save_path
+                )
+            )
+
+        future.add_done_callback(lambda done: self._remember(key, done))
+        return future
+
+    def _remember(self, key: tuple[str, int], future: Future):
+        """Cache the renditions of a finished preparation."""
+
+        if not future.cancelled() and not future.exception():
+            renditions.put(key, future.result())
+
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def shutdown(self):
+        """Stop the worker processes, dropping pending work."""
+
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._in_flight.clear()
+
+
+# shared by every game in the session
+images = ImagePool()
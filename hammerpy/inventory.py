@@ -0,0 +1,229 @@
+"""Background prefetcher that keeps downloaded works ready for every source and filter."""
+
+from collections import deque
+from json import dumps, load
+from os import makedirs, path, replace
+from queue import Queue
+from threading import Event, Lock, Thread
+from time import monotonic
+
+from hammerpy import sources
+from hammerpy.imagecache import image_cache
+from hammerpy.util import CACHE_DIR, Artwork, Scraper
+
+INVENTORY_DIR = f"{CACHE_DIR}/inventory"
+
+# how many ready-to-play works are kept for each source and filter
+INVENTORY_SIZE = 10
+
+# how long to back off after a refill fails, e.g. when offline
+RETRY_DELAY = 60
+
+
+class Inventory(Thread):
+    """Keeps a warm pool of fully downloaded works per (source, filter) and refills it.
+
+    `filters` maps each source type to the slugs of its filters. A source is only
+    refilled once its backend is loaded or one of its filters is prioritized, so
+    prefetching never imports a backend the player hasn't picked.
+    Stocked images are held in the image cache, and the pool survives restarts
+    through a manifest. Refills pause while a game scrapes, see pause().
+    """
+
+    def __init__(
+        self,
+        filters: dict[int, list[str]],
+        size: int = INVENTORY_SIZE,
+        directory: str = INVENTORY_DIR,
+        catalog=None,
+    ):
+        super().__init__()
+        self.daemon = True
+        self.size = size
+        self.directory = directory
+        self._catalog = catalog
+        self._stock = {
+            (src, slug): [] for src, slugs in filters.items() for slug in slugs
+        }
+        self._priority = deque()
+        self._backoff = {}  # (source, filter) -> when a failed refill may be retried
+        self._lock = Lock()
+        self._wake = Event()
+        self._scraper = None
+        self._running = True
+        self._game_idle = Event()  # cleared while a game scrapes
+        self._game_idle.set()
+
+        self._load()
+
+    def _manifest(self) -> str:
+        """Path of the file that remembers the pool between sessions."""
+
+        return f"{self.directory}/manifest.json"
+
+    def _load(self):
+        """Restore the works left over from the last session, if their images survived."""
+
+        try:
+            with open(self._manifest(), encoding="utf8") as file:
+                entries = load(file)
+        except (OSError, ValueError):
+            return
+
+        for entry in entries:
+            key = (entry["src"], entry["slug"])
+            if key not in self._stock:
+                continue
+
+            save_path = image_cache.lookup(entry["image_url"], hold=True)
+            if save_path:
+                work = Artwork(entry["title"], entry["image_url"], entry["prices"])
+                self._stock[key].append((work, save_path))
+
+    def _save(self):
+        """Atomically write the manifest, call with the lock held."""
+
+        entries = [
+            {
+                "src": src,
+                "slug": slug,
+                "title": work.title,
+                "image_url": work.image_url,
+                "prices": work.prices,
+                "path": save_path,
+            }
+            for (src, slug), stock in self._stock.items()
+            for work, save_path in stock
+        ]
+
+        makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._manifest()}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as file:
+            file.write(dumps(entries))
+        replace(tmp_path, self._manifest())
+
+    def prioritize(self, src: int, slug: str):
+        """Refill this pair before any other, e.g. because it's selected in the menu.
+
+        Only the latest pair is prioritized, browsing through the filters doesn't
+        queue up every one of them.
+        """
+
+        with self._lock:
+            self._priority.clear()
+            self._priority.append((src, slug))
+            self._backoff.pop((src, slug), None)
+        self._wake.set()
+
+    def take(self, src: int, slug: str, amount: int) -> list[tuple[Artwork, str]]:
+        """Hand out up to `amount` ready works, their images now held on the game's behalf."""
+
+        with self._lock:
+            taken = []
+            stock = []
+            for work, save_path in self._stock.get((src, slug), []):
+                if not path.isfile(save_path):
+                    # removed from under us, e.g. by hand, it will be replaced
+                    image_cache.release(save_path)
+                elif len(taken) < amount:
+                    taken.append((work, save_path))
+                else:
+                    stock.append((work, save_path))
+            self._stock[(src, slug)] = stock
+            self._save()
+
+        self.prioritize(src, slug)
+        return taken
+
+    def pause(self):
+        """Stop refilling while a game scrapes, so they don't share the per-host limits."""
+
+        self._game_idle.clear()
+        with self._lock:
+            if self._scraper:
+                self._scraper.stop()
+
+    def resume(self):
+        """Refill again, e.g. once the game has all its works."""
+
+        self._game_idle.set()
+
+    def stop(self):
+        """Stop refilling."""
+
+        self._running = False
+        if self._scraper:
+            self._scraper.stop()
+        self._game_idle.set()
+        self._wake.set()
+
+    def _next_key(self) -> tuple[tuple[int, str] | None, float | None]:
+        """The pair most in need of a refill, prioritized ones first.
+
+        If none can be refilled right now, also returns how long until a pair that
+        recently failed may be retried.
+        """
+
+        now = monotonic()
+        retry_in = None
+        with self._lock:
+            for key in list(self._priority) + list(self._stock):
+                if len(self._stock[key]) >= self.size:
+                    continue
+                if key not in self._priority and not sources.is_loaded(key[0]):
+                    continue
+                if (wait := self._backoff.get(key, 0.0) - now) <= 0:
+                    return (key, None)
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+
+        return (None, retry_in)
+
+    def _refill(self, src: int, slug: str):
+        """Scrape and download works for one pair until its pool is full."""
+
+        scrape_fn = sources.load(src)
+        missing = self.size - len(self._stock[(src, slug)])
+
+        q = Queue()
+        with self._lock:
+            # a game started meanwhile, it goes first
+            if not self._game_idle.is_set():
+                return
+            self._scraper = Scraper(
+                q,
+                missing,
+                src,
+                slug,
+                scrape_fn,
+                catalog=self._catalog,
+            )
+
+        # run the scraper on this thread, the queue just collects its results
+        try:
+            self._scraper.run()
+        finally:
+            # keep whatever was downloaded, even if the scraper failed part way
+            while not q.empty():
+                if item := q.get_nowait():
+                    with self._lock:
+                        self._stock[(src, slug)].append(item)
+                        self._save()
+
+    def run(self):
+        """Keep every pool topped up, sleeping while they are all full."""
+
+        while self._running:
+            self._game_idle.wait()
+            key, retry_in = self._next_key()
+            if not key:
+                self._wake.wait(retry_in)
+                self._wake.clear()
+                continue
+
+            try:
+                self._refill(*key)
+            except Exception:  # pylint: disable=broad-except
+                # whatever went wrong (offline, site changes, no browser), a background
+                # prefetch must never take the game down, so move on and retry later
+                with self._lock:
+                    self._backoff[key] = monotonic() + RETRY_DELAY
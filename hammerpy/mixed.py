@@ -0,0 +1,118 @@
+"""Mixed games: every source is scraped at once, works are taken from whichever answers first."""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock
+
+from hammerpy import sources
+from hammerpy.filters import Mix
+from hammerpy.util import Artwork
+
+# a source that fails this many times in a row sits out the rest of the game
+MAX_FAILURES = 3
+
+
+class FanOut:
+    """Scrapes every (source, filter) pair of a Mix filter concurrently and merges their works.
+
+    Each pair always has one scrape in flight. A call returns as soon as any
+    of them has answered, and works from a slow source that arrive later are
+    kept for the next call instead of holding this one up.
+
+    sources.load gives every scraper its own FanOut, so buffered works and
+    failed sources never carry over into another game.
+    """
+
+    def __init__(self):
+        self.members = ()
+        self._slug = None
+        self._executor = None
+        self._lock = Lock()
+        self._reset()
+
+    def _reset(self):
+        """Forget what was learned about the sources, call with the lock held."""
+
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        self._buffer = []  # works that arrived but weren't handed out yet
+        self._pending = {}  # member -> its scrape in flight
+        self._exhausted = set()
+        self._failures = dict.fromkeys(self.members, 0)
+
+    def _collect(self):
+        """Move the works of every finished scrape into the buffer."""
+
+        for member, future in list(self._pending.items()):
+            if not future.done():
+                continue
+
+            del self._pending[member]
+            try:
+                works, exhausted = future.result()
+            except Exception as err:  # pylint: disable=broad-except
+                # one broken source mustn't end a game the others can still fill
+                print(f"Source {member} failed: {err}")
+                self._failures[member] += 1
+                if self._failures[member] >= MAX_FAILURES:
+                    self._exhausted.add(member)
+                continue
+
+            self._failures[member] = 0
+            self._buffer += works
+            if exhausted:
+                self._exhausted.add(member)
+
+    def _submit(self, amount: int, validate: bool):
+        """Start a scrape for every member that's idle and not exhausted."""
+
+        for member in self.members:
+            if member in self._pending or member in self._exhausted:
+                continue
+
+            if not self._executor:
+                self._executor = ThreadPoolExecutor(max_workers=len(self.members))
+
+            src, slug = member
+            self._pending[member] = self._executor.submit(
+                sources.load(src), slug, amount, validate=validate
+            )
+
+    def __call__(
+        self, slug: str, amount: int, validate: bool = True
+    ) -> tuple[list[Artwork], bool]:
+        """Scrape every source of a Mix filter at once, merging works as they arrive."""
+
+        while True:
+            with self._lock:
+                if slug != self._slug:
+                    self._slug = slug
+                    self.members = Mix[slug].value
+                    self._reset()
+
+                self._collect()
+                if not self._buffer:
+                    self._submit(amount, validate)
+
+                if self._buffer or not self._pending:
+                    # keep the other sources busy while the caller downloads these
+                    self._submit(amount, validate)
+
+                    works, self._buffer = self._buffer[:amount], self._buffer[amount:]
+                    exhausted = not self._buffer and not self._pending
+                    if exhausted:
+                        self._reset()
+
+                    return (works, exhausted)
+
+                pending = list(self._pending.values())
+
+            # waiting outside the lock, so close() is never held up by a slow source
+            wait(pending, return_when=FIRST_COMPLETED)
+
+    def close(self):
+        """Drop the scrapes still in flight, e.g. once the game has all its works."""
+
+        with self._lock:
+            self._reset()
@@ -0,0 +1,212 @@
+"""Shared HTTP session layer so every scraper reuses pooled keep-alive connections."""
+
+from os import path, remove, replace
+from threading import get_ident, local, Lock, RLock
+from time import monotonic, sleep
+from urllib.parse import urlsplit
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+# number of distinct hosts that keep a cached connection pool (artsy, image CDN, jsdelivr, ...)
+POOL_CONNECTIONS = 8
+
+# max number of kept-alive connections per host
+POOL_MAXSIZE = 16
+
+# size of the chunks used when streaming response bodies to disk
+CHUNK_SIZE = 64 * 1024
+
+# politeness: sustained requests per second allowed to any single host, and burst size
+HOST_RATE = 4.0
+HOST_BURST = 8
+
+_lock = RLock()
+_local = local()
+_adapter = None
+_generation = 0
+
+
+class TokenBucket:
+    """Allows bursts of up to `capacity` calls, refilled at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._stamp = monotonic()
+        self._lock = Lock()
+
+    def take(self) -> float:
+        """Try to take a token. Returns 0 on success, else how long to wait before retrying."""
+
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._stamp) * self.rate
+            )
+            self._stamp = now
+
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Take a token, sleeping until one is available."""
+
+        while wait := self.take():
+            sleep(wait)
+
+
+class RateLimiter:
+    """Keeps a separate TokenBucket for every host so one slow site doesn't throttle another."""
+
+    def __init__(self, rate: float = HOST_RATE, capacity: int = HOST_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """The bucket that meters requests to the host of `url`."""
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.capacity)
+            return self._buckets[host]
+
+    def acquire(self, url: str):
+        """Block until a request to the host of `url` is allowed."""
+
+        self.bucket(url).acquire()
+
+
+# every request made through this module is metered by this limiter
+limiter = RateLimiter()
+
+
+def configure(
+    pool_connections: int = POOL_CONNECTIONS,
+    pool_maxsize: int = POOL_MAXSIZE,
+    adapter_cls: type[HTTPAdapter] = HTTPAdapter,
+):
+    """Resize the connection pools. Sessions pick up the new adapter on their next use.
+
+    `adapter_cls` can swap the transport, e.g. to send every request to a local stand-in.
+    """
+
+    global _adapter, _generation
+
+    with _lock:
+        old = _adapter
+        _adapter = adapter_cls(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        _generation += 1
+
+    if old:
+        old.close()
+
+
+def _shared_adapter() -> tuple[HTTPAdapter, int]:
+    """Lazily create the adapter whose per-host pools are shared by all threads."""
+
+    if not _adapter:
+        with _lock:
+            if not _adapter:
+                configure()
+    return _adapter, _generation
+
+
+def get_session() -> Session:
+    """Return this thread's Session.
+
+    Each thread gets its own Session (cookies and headers are not thread-safe),
+    but all of them mount the same adapter, so the urllib3 pools - and therefore
+    the open TCP/TLS connections - are shared across threads.
+    """
+
+    adapter, generation = _shared_adapter()
+    session = getattr(_local, "session", None)
+    if session is None or _local.generation != generation:
+        session = Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+        _local.generation = generation
+
+    return session
+
+
+def request(method: str, url: str, **kwargs):
+    """Make a rate limited request through the pooled session."""
+
+    limiter.acquire(url)
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs):
+    """Drop-in replacement for requests.get that goes through the pooled session."""
+
+    return request("GET", url, **kwargs)
+
+
+def probe(url: str, timeout: int = 10) -> bool:
+    """Cheaply check that a URL is reachable without transferring its body.
+
+    Tries a HEAD first, and falls back to a 1-byte range request for hosts that
+    reject or mishandle HEAD.
+    """
+
+    resp = request("HEAD", url, allow_redirects=True, timeout=timeout)
+    if resp.status_code == 200:
+        return True
+
+    with get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=timeout) as resp:
+        return resp.status_code in (200, 206)
+
+
+def fetch_image(url: str, save_path: str, timeout: int = 10) -> bool:
+    """Validate and save an image in a single streamed GET.
+
+    Returns False (leaving nothing on disk) if the server doesn't answer with an image.
+    """
+
+    # write to a temporary file first so a dropped connection never leaves half an image,
+    # named per thread since two works can share a save path
+    part_path = f"{save_path}.{get_ident()}.part"
+    try:
+        with get(url, stream=True, timeout=timeout) as resp:
+            if resp.status_code != 200 or not resp.headers.get(
+                "Content-Type", "image/"
+            ).startswith("image/"):
+                return False
+
+            with open(part_path, "wb") as file:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    file.write(chunk)
+
+        replace(part_path, save_path)
+    except RequestException:
+        return False
+    finally:
+        # whatever went wrong (network, full disk, ...), no half image is left behind
+        if path.isfile(part_path):
+            remove(part_path)
+
+    return True
+
+
+def close():
+    """Close all pooled connections, e.g. when the game exits."""
+
+    global _adapter
+
+    with _lock:
+        if _adapter:
+            _adapter.close()
+            _adapter = None
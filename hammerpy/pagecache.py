@@ -0,0 +1,169 @@
+"""On-disk cache of listing pages, revalidated with ETag/Last-Modified."""
+
+from hashlib import sha1
+from json import dumps, load
+from os import makedirs, path, remove, replace, scandir, utime
+from threading import Lock, get_ident
+from time import time
+
+from hammerpy.net import get
+from hammerpy.util import CACHE_DIR
+
+PAGES_DIR = f"{CACHE_DIR}/pages"
+
+# pages younger than this are used without asking the server at all
+PAGE_FRESHNESS = 6 * 60 * 60
+
+# total size of cached pages before the least recently used ones are evicted
+PAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class PageCache:
+    """Caches listing pages by key, e.g. Medium slug and page number.
+
+    Fresh pages cost nothing, stale ones are revalidated with a conditional GET
+    so an unchanged page only costs a 304.
+    """
+
+    def __init__(
+        self,
+        directory: str = PAGES_DIR,
+        freshness: int = PAGE_FRESHNESS,
+        max_bytes: int = PAGE_CACHE_BYTES,
+    ):
+        self.directory = directory
+        self.freshness = freshness
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        """Where the body and the metadata of a page are stored."""
+
+        name = sha1(key.encode("utf8")).hexdigest()
+        return (f"{self.directory}/{name}.html", f"{self.directory}/{name}.json")
+
+    def _meta(self, key: str) -> dict | None:
+        """The stored metadata of a page, if its body is cached too."""
+
+        body_path, meta_path = self._paths(key)
+        if not path.isfile(body_path) or not path.isfile(meta_path):
+            return None
+
+        try:
+            with open(meta_path, encoding="utf8") as file:
+                return load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _read(self, key: str) -> str | None:
+        """Read a cached body, marking it as recently used."""
+
+        body_path, _ = self._paths(key)
+        try:
+            with open(body_path, encoding="utf8") as file:
+                body = file.read()
+            utime(body_path)
+        except OSError:
+            return None
+
+        return body
+
+    def _write(self, target: str, data: str):
+        """Atomically replace a file in the cache."""
+
+        tmp_path = f"{target}.{get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as file:
+            file.write(data)
+        replace(tmp_path, target)
+
+    def _save_meta(self, key: str, meta: dict):
+        """Atomically write a page's metadata."""
+
+        _, meta_path = self._paths(key)
+        self._write(meta_path, dumps(meta))
+
+    def lookup(self, key: str) -> tuple[str | None, dict]:
+        """Returns the page if it's still fresh, else the headers for a conditional GET."""
+
+        meta = self._meta(key)
+        if not meta:
+            return (None, {})
+
+        if time() - meta["fetched"] < self.freshness:
+            if (body := self._read(key)) is not None:
+                return (body, {})
+
+        validators = {}
+        if meta.get("etag"):
+            validators["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            validators["If-Modified-Since"] = meta["last_modified"]
+
+        return (None, validators)
+
+    def update(self, key: str, status: int, headers, body: str) -> str:
+        """Record the response to a (conditional) GET and return the page to use."""
+
+        # not modified: the copy we have is good for another freshness window
+        if status == 304:
+            meta = self._meta(key)
+            cached = self._read(key)
+            if meta and cached is not None:
+                meta["fetched"] = time()
+                self._save_meta(key, meta)
+                return cached
+
+        if status != 200:
+            return body
+
+        makedirs(self.directory, exist_ok=True)
+        body_path, _ = self._paths(key)
+        self._write(body_path, body)
+        self._save_meta(
+            key,
+            {
+                "fetched": time(),
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+            },
+        )
+        self._evict()
+
+        return body
+
+    def fetch(self, key: str, url: str, **kwargs) -> str:
+        """Get a page through the cache, going to the network only when needed."""
+
+        body, validators = self.lookup(key)
+        if body is not None:
+            return body
+
+        headers = {**kwargs.pop("headers", {}), **validators}
+        resp = get(url, headers=headers, **kwargs)
+        return self.update(key, resp.status_code, resp.headers, resp.text)
+
+    def _evict(self):
+        """Drop least recently used pages until the cache fits in its budget."""
+
+        with self._lock:
+            cached = []
+            total = 0
+            for entry in scandir(self.directory):
+                if entry.name.endswith(".html"):
+                    stat = entry.stat()
+                    cached.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            cached.sort()
+            while total > self.max_bytes and cached:
+                _, size, body_path = cached.pop(0)
+                total -= size
+                for stale in (body_path, body_path[:-4] + "json"):
+                    try:
+                        remove(stale)
+                    except FileNotFoundError:
+                        pass
+
+
+# shared by every scraper in the session
+pages = PageCache()
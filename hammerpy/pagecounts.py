@@ -0,0 +1,93 @@
+"""How many listing pages each source and filter has, cached and refreshed off the game's path."""
+
+from json import dump, load
+from os import makedirs, path, replace
+from threading import Lock, Thread, get_ident
+from time import time
+from types import FunctionType
+
+from hammerpy.util import CACHE_DIR
+
+PAGE_COUNTS_FILE = f"{CACHE_DIR}/pagecounts.json"
+
+# bump whenever the layout of the file changes, older files are then ignored
+PAGE_COUNTS_VERSION = 1
+
+# listings grow and shrink slowly, so a count is trusted for a day
+PAGE_COUNT_TTL = 24 * 60 * 60
+
+
+class PageCounts:
+    """Page counts per (source, filter), saved to disk and refreshed in the background.
+
+    A count is always answered from what is stored, even a stale one, so looking
+    one up never waits on the network. Stale counts are rediscovered on a
+    background thread with the function the caller passes along.
+    """
+
+    def __init__(self, store: str = PAGE_COUNTS_FILE, ttl: int = PAGE_COUNT_TTL):
+        self.store = store
+        self.ttl = ttl
+        self._counts = {}  # "source:filter" -> {"pages": count, "checked": timestamp}
+        self._refreshing = set()
+        self._lock = Lock()
+
+        try:
+            with open(store, encoding="utf8") as file:
+                saved = load(file)
+            if saved.get("version") == PAGE_COUNTS_VERSION:
+                self._counts = saved["counts"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def _save(self):
+        """Atomically write every count, call with the lock held."""
+
+        makedirs(path.dirname(self.store), exist_ok=True)
+        tmp_path = f"{self.store}.{get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as file:
+            dump({"version": PAGE_COUNTS_VERSION, "counts": self._counts}, file)
+        replace(tmp_path, self.store)
+
+    def get(
+        self, src: int, slug: str, discover: FunctionType | None = None
+    ) -> int | None:
+        """The stored page count, or None if it was never seen.
+
+        If the count is stale, `discover()` is run in the background to replace it.
+        """
+
+        key = f"{src}:{slug}"
+        with self._lock:
+            entry = self._counts.get(key)
+            stale = entry and time() - entry["checked"] > self.ttl
+            if stale and discover and key not in self._refreshing:
+                self._refreshing.add(key)
+                Thread(
+                    target=self._refresh, args=(src, slug, discover), daemon=True
+                ).start()
+
+        return entry["pages"] if entry else None
+
+    def put(self, src: int, slug: str, pages: int):
+        """Record a freshly learned page count."""
+
+        with self._lock:
+            self._counts[f"{src}:{slug}"] = {"pages": int(pages), "checked": time()}
+            self._save()
+
+    def _refresh(self, src: int, slug: str, discover: FunctionType):
+        """Background task: rediscover one page count."""
+
+        try:
+            self.put(src, slug, discover())
+        except Exception:  # pylint: disable=broad-except
+            # the stale count keeps serving, the next lookup tries again
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(f"{src}:{slug}")
+
+
+# shared by every scraper in the session
+page_counts = PageCounts()
@@ -0,0 +1,111 @@
+"""USD exchange rates, fetched as one table and cached in memory and on disk."""
+
+from json import dump, load
+from os import makedirs, path, replace
+from threading import Lock
+from time import time
+
+from requests.exceptions import RequestException
+
+from hammerpy.net import get
+from hammerpy.util import CACHE_DIR
+
+# base of the currency api, the usd table holds the rate of every currency we support
+PREFIX = "https://cdn.jsdelivr.net/gh/fawazahmed0/currency-api@1/latest/currencies/"
+RATES_URL = f"{PREFIX}usd.json"
+
+# the api publishes new rates once a day, so half a day old is still fresh enough
+RATES_TTL = 12 * 60 * 60
+
+# how long to keep using an outdated table after a refresh failed, e.g. when offline
+RATES_RETRY = 5 * 60
+
+RATES_FILE = f"{CACHE_DIR}/usd.json"
+
+
+class ExchangeRates:
+    """Answers exchange rate lookups from a single cached usd.json table."""
+
+    def __init__(
+        self, url: str = RATES_URL, cache_file: str = RATES_FILE, ttl: int = RATES_TTL
+    ):
+        self.url = url
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self._table = {}
+        self._fetched = 0.0
+        self._retry_at = 0.0  # no refresh is attempted before this, after a failure
+        self._lock = Lock()
+
+    def _stale(self) -> bool:
+        """Whether the table needs refreshing."""
+
+        if self._table and time() < self._retry_at:
+            return False
+        return not self._table or time() - self._fetched > self.ttl
+
+    def _load_disk(self):
+        """Use the table saved by a previous session, if there is one."""
+
+        if not path.isfile(self.cache_file):
+            return
+
+        try:
+            with open(self.cache_file, encoding="utf8") as file:
+                cached = load(file)
+            self._table = cached["usd"]
+            self._fetched = cached["fetched"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save_disk(self):
+        """Write the table next to the other caches, atomically."""
+
+        makedirs(path.dirname(self.cache_file), exist_ok=True)
+        tmp_path = f"{self.cache_file}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as file:
+            dump({"fetched": self._fetched, "usd": self._table}, file)
+        replace(tmp_path, self.cache_file)
+
+    def table(self) -> dict[str, float]:
+        """The full usd table, fetching it at most once per TTL."""
+
+        with self._lock:
+            if self._stale():
+                self._load_disk()
+
+            if self._stale():
+                try:
+                    resp = get(self.url, timeout=10)
+                    resp.raise_for_status()
+                    self._table = resp.json()["usd"]
+                    self._fetched = time()
+                except (RequestException, ValueError, KeyError):
+                    # an outdated rate is better than no game, so only give up without one
+                    if not self._table:
+                        raise
+                    # and don't hold every lookup up retrying it
+                    self._retry_at = time() + RATES_RETRY
+                else:
+                    try:
+                        self._save_disk()
+                    except OSError:
+                        # e.g. a read-only cache, the table is still good for this session
+                        pass
+
+            return self._table
+
+    def rate(self, code: str) -> float:
+        """How many units of a currency one US dollar buys."""
+
+        return float(self.table()[code])
+
+
+# shared by every scraper in the session
+rates = ExchangeRates()
+
+
+def exchange_rate(code: str) -> float:
+    """Look up a currency code in the shared exchange rate table."""
+
+    return rates.rate(code)
@@ -1,118 +1,126 @@
 """Scrapes Artwork instances from the historic auction house of Sotheby's"""
 
-from random import randint
+from math import ceil
+from random import choice, sample
 from urllib.parse import unquote
-from enum import Enum
 from json import loads
 from gzip import decompress
-from array import array
+from re import escape
 
-from seleniumwire import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.firefox.options import Options
+from requests.exceptions import RequestException
 
+from hammerpy.algolia import ALGOLIA_URL, client
+from hammerpy.filters import Category
+from hammerpy.net import probe
+from hammerpy.pagecounts import page_counts
+from hammerpy.trace import span
 from hammerpy.util import Artwork
-from hammerpy.artsy import AGENTP1, AGENTP2
-
-
-# Sotheby's has a WIDE breadth of items
-#
-# We start by declaring all the different categories
-# and assign their URL slugs as their values
-class Category(Enum):
-    """For allowing the user to choose a scraping category."""
-
-    ALL = "shop-all"
-    JEWELRY = "luxury/jewelry"
-    WATCHES = "luxury/watches"
-    HANDBAGS = "fashion/handbag"
-    BOOKS = "luxury/books-&-manuscripts"
-    ART = "art-&-design"
-    COLLECTIBLES = "luxury/collectibles"
-    CARS = "luxury/vehicles/car"
-    INTERIORS = "interiors"
-    APPAREL = "fashion/apparel"
-    SNEAKERS = "fashion/sneaker"
-
-
-def get_page_limit(url: str, pmax_arr: array, idx: int) -> int:
+
+# source type of Sotheby's, as used by the menu and the catalog
+SOURCE = 1
+
+# how long a listing page gets to send its search request
+SEARCH_TIMEOUT = 15
+
+# most listing pages searched at once, when a scrape wants more works than one lists
+MAX_PAGES = 5
+
+
+def get_page_limit(cat: str) -> int:
     """Dynamically determines the max number of pages for a search."""
 
-    options = Options()
-    options.add_argument("--headless")
-    driver = webdriver.Chrome(options=options)
-    driver.get(url)
+    return search(cat, [1])[0]["nbPages"]
 
-    # to get the page limit for this category, we read
-    # the second to last element of pagination
-    last_li = WebDriverWait(driver, 5).until(
-        EC.presence_of_element_located((By.TAG_NAME, "nav"))
-    )
-    pages = last_li.find_elements(By.TAG_NAME, "li")
-    if len(pages) == 1:
-        pmax = 1
-    else:
-        pmax = int(pages[-2].text)
 
-    pmax_arr[idx] = pmax
+def browser_search(cat: str, url: str) -> dict:
+    """Load a listing page in a browser and return the search result it received.
 
-    # Write to file so next time we don't need to do all this
-    with open("hammerpy/sothpmax", "wb+") as file:
-        pmax_arr.tofile(file)
+    The parameters of the page's search request are saved along the way, so later
+    searches for the category can skip the browser.
+    """
 
-    driver.quit()
-    return pmax
+    # Selenium is only loaded once a browser is actually needed, searches with
+    # known parameters never touch it
+    from selenium.common.exceptions import TimeoutException
+    from hammerpy.drivers import pool
 
+    # browsers are launched once and reused, so this only costs the page load
+    with span("sothebys.browser", category=cat), pool.driver() as driver:
+        print(f"LOADING {url}...")
+        driver.get(url)
 
-def scrape_sothebys(cat: str, amount: int) -> tuple[list[Artwork], bool]:
-    """Main scraping routine for extracting Artwork."""
+        # only the search host is recorded, so this returns as soon as its response
+        # is in, and the rest of the page is abandoned when the driver is released
+        try:
+            request = driver.wait_for_request(escape(ALGOLIA_URL), SEARCH_TIMEOUT)
+        except TimeoutException:
+            return {"hits": []}
 
-    scrape_url = f"https://www.sothebys.com/en/buy/{Category[cat].value}"
+        try:
+            client.remember(cat, request.url, request.headers, request.body)
+        except (ValueError, KeyError, IndexError):
+            pass
 
-    pagemax = 0
+        # decode Sotheby's search response to JSON
+        items = loads(decompress(request.response.body).decode("utf8"))
+        return items["results"][0]
 
-    with open("hammerpy/sothpmax", "rb") as file:
-        pmax_arr = array("B")
-        pmax_arr.fromfile(file, len(Category))
-        idx = list(name for name, _ in Category.__members__.items()).index(cat)
-        pagemax = pmax_arr[idx]
 
-    # if no pagemax recorded for category, or stored pagemax fails diagnostic test
-    if not pagemax:
-        pagemax = get_page_limit(scrape_url, pmax_arr, idx)
+def search(cat: str, pages: list[int]) -> list[dict]:
+    """Search some of a category's pages with one small JSON request.
 
-    scrape_url = f"{scrape_url}?page={randint(1,pagemax)}"
-    options = Options()
-    options.add_argument(f"--user-agent='{AGENTP1} {AGENTP2}'")
-    options.add_argument("--headless")
-    driver = webdriver.Chrome(options=options)
+    The browser is only used when the request parameters are unknown or have
+    gone stale, and then only the first page is searched.
+    """
 
-    print(f"LAUNCHING {scrape_url}...")
-    driver.get(scrape_url)
+    if client.has_template(cat):
+        try:
+            with span("sothebys.search", category=cat, pages=len(pages)):
+                return client.search([(cat, page) for page in pages])
+        except (RequestException, ValueError, KeyError, IndexError):
+            # e.g. a rotated api key, capture the parameters again below
+            client.forget(cat)
 
-    items = []
-    works = []
+    url = f"https://www.sothebys.com/en/buy/{Category[cat].value}?page={pages[0]}"
+    return [browser_search(cat, url)]
+
+
+def validated(url: str) -> bool:
+    """Probe an image URL, as a span of the trace."""
+
+    with span("sothebys.validate"):
+        return probe(url)
 
-    # inspect Sotheby's GraphQL requests, and decode the data to JSON
-    for request in driver.requests:
-        if (
-            request.url.startswith(
-                "https://kar1ueupjd-dsn.algolia.net/1/indexes/*/queries"
-            )
-            and request.response
-        ):
-            items = loads(decompress(request.response.body).decode("utf8"))
-            break
 
-    driver.quit()
-    items = items["results"][0]["hits"]
+def scrape_sothebys(
+    cat: str, amount: int, validate: bool = True
+) -> tuple[list[Artwork], bool]:
+    """Main scraping routine for extracting Artwork.
+
+    Pass validate=False if the caller checks each image while downloading it.
+    """
+
+    # every search also answers the page count, so an unknown or stale one is
+    # learned from this very search instead of a separate one
+    pagemax = page_counts.get(SOURCE, cat) or 1
+
+    # more works than a page lists come from several pages, searched in one call
+    wanted = min(pagemax, MAX_PAGES, ceil(amount / client.hits_per_page(cat)))
+    found = search(cat, sample(range(1, pagemax + 1), wanted))
+    if "nbPages" in found[0]:
+        page_counts.put(SOURCE, cat, found[0]["nbPages"])
+        pagemax = found[0]["nbPages"]
+
+    works = []
+
+    items = [hit for result in found for hit in result["hits"]]
     results = len(items)
 
     # Randomly select and get metadata for items
     for _ in range(amount):
-        work = items[randint(1, results)]
+        if not items:
+            break
+        work = choice(items)
 
         # Get Artwork members
         img_url = work["imageUrl"]
@@ -120,6 +128,13 @@ def scrape_sothebys(cat: str, amount: int) -> tuple[list[Artwork], bool]:
         # Retrieve full resolution image
         img_url = unquote(img_url[img_url.index("?url=") + 5 :])
 
+        # skip works whose full resolution image isn't actually available
+        if validate and not validated(img_url):
+            items.remove(work)
+            if not items:
+                break
+            continue
+
         works.append(
             Artwork(work["title"], img_url, [work["lowEstimate"], work["highEstimate"]])
         )
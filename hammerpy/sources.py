@@ -0,0 +1,89 @@
+"""Registry of the sources works are scraped from, each backend imported on first use."""
+
+from dataclasses import dataclass
+from enum import Enum
+from importlib import import_module
+from sys import modules
+from collections.abc import Callable
+from threading import Lock
+
+from hammerpy import startup
+from hammerpy.filters import Category, Medium, Mix
+
+
+@dataclass
+class Source:
+    """A source the player can pick, and where its backend lives.
+
+    Every backend exposes a scrape function with the same signature,
+    `scrape(slug, amount, validate=True) -> (works, exhausted)`. A composite
+    source exposes a class of such callables instead, see `load`.
+    """
+
+    name: str
+    key: str  # menu shortcut
+    module: str
+    scrape: str
+    filters: type[Enum]
+    # whether a filter's slug is its value rather than its name
+    slug_by_value: bool = False
+    # whether it only draws from the other sources
+    composite: bool = False
+
+    def labels(self) -> list[str]:
+        """Filter names as shown in the menu."""
+
+        return [f.name.capitalize().replace("_", " ") for f in self.filters]
+
+    def slug(self, label: str) -> str:
+        """Filter slug for a label shown in the menu."""
+
+        member = self.filters[label.upper().replace(" ", "_")]
+        return member.value if self.slug_by_value else member.name
+
+    def slugs(self) -> list[str]:
+        """Slugs of every filter."""
+
+        return [self.slug(label) for label in self.labels()]
+
+
+# source type -> source, the type is what the menu, catalog and inventory store
+SOURCES = {
+    0: Source("Artsy", "a", "hammerpy.artsy", "scrape_artsy", Medium, True),
+    1: Source("Sotheby's", "s", "hammerpy.sothebys", "scrape_sothebys", Category),
+    2: Source("Mixed", "m", "hammerpy.mixed", "FanOut", Mix, composite=True),
+}
+
+_lock = Lock()
+
+
+def is_loaded(src: int) -> bool:
+    """Whether a source's backend has been imported yet."""
+
+    return SOURCES[src].module in modules
+
+
+def load(src: int) -> Callable:
+    """The scrape function of a source, importing its backend if needed.
+
+    Nobody pays for a backend's dependencies until its source is actually picked.
+    Composite sources keep state between calls, so every caller gets its own.
+    """
+
+    source = SOURCES[src]
+    with _lock:
+        if source.module not in modules:
+            with startup.timed(f"import {source.module}"):
+                import_module(source.module)
+
+    scrape = getattr(modules[source.module], source.scrape)
+    return scrape() if source.composite else scrape
+
+
+def shutdown():
+    """Release whatever the loaded backends hold on to, browsers and connections."""
+
+    if drivers := modules.get("hammerpy.drivers"):
+        drivers.pool.shutdown()
+    if net := modules.get("hammerpy.net"):
+        net.close()
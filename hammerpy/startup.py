@@ -0,0 +1,63 @@
+"""Cold-start profile: where the time goes between launching hammer.py and the first frame."""
+
+from contextlib import contextmanager
+from os import environ
+from threading import Lock
+from time import perf_counter
+
+# set HAMMERPY_PROFILE=1 to print the startup profile
+ENABLED = environ.get("HAMMERPY_PROFILE") == "1"
+
+# the clock starts when this module is first imported, i.e. at the top of hammer.py
+_start = perf_counter()
+_last = _start
+_steps = []  # (step, seconds)
+_reported = False
+_lock = Lock()
+
+
+def _record(step: str, seconds: float):
+    """Keep a step, or print it right away if the report is already out."""
+
+    with _lock:
+        _steps.append((step, seconds))
+        if ENABLED and _reported:
+            print(f"[startup] {step:<32}{seconds * 1000:>9.1f} ms")
+
+
+def mark(step: str):
+    """Close a step of the startup sequence, timed from the previous mark."""
+
+    global _last  # pylint: disable=global-statement
+
+    now = perf_counter()
+    _record(step, now - _last)
+    _last = now
+
+
+@contextmanager
+def timed(step: str):
+    """Time a block that isn't part of the sequence, e.g. loading a backend later on."""
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        _record(step, perf_counter() - start)
+
+
+def report():
+    """Print every step so far and the time it took to get the window up."""
+
+    global _reported  # pylint: disable=global-statement
+
+    total = perf_counter() - _start
+    with _lock:
+        _reported = True
+        if not ENABLED:
+            return
+
+        print(f"[startup] {'step':<32}{'time':>12}")
+        for step, seconds in _steps:
+            print(f"[startup] {step:<32}{seconds * 1000:>9.1f} ms")
+        print(f"[startup] {'time to window':<32}{total * 1000:>9.1f} ms")
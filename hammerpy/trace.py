@@ -0,0 +1,86 @@
+"""Timed spans around each stage of the pipeline, exportable as a Chrome/Perfetto JSON trace."""
+
+from collections import deque
+from contextlib import contextmanager
+from json import dump
+from os import environ, getpid, makedirs, path
+from threading import get_ident
+from time import perf_counter
+
+# set HAMMERPY_TRACE to a file name to record spans and write them there on exit
+TRACE_FILE = environ.get("HAMMERPY_TRACE", "")
+
+# set HAMMERPY_TRACE_OVERLAY=1 to show a live summary of the spans on the loading screen
+OVERLAY = environ.get("HAMMERPY_TRACE_OVERLAY") == "1"
+
+ENABLED = bool(TRACE_FILE) or OVERLAY
+
+# spans kept in memory, the oldest are dropped beyond this
+MAX_SPANS = 100_000
+
+_origin = perf_counter()
+_spans = deque(maxlen=MAX_SPANS)  # (name, start, duration, thread, args)
+
+
+def add(name: str, start: float, duration: float, **args):
+    """Record a span measured by the caller, e.g. across threads or processes."""
+
+    if ENABLED:
+        _spans.append((name, start, duration, get_ident(), args))
+
+
+@contextmanager
+def span(name: str, **args):
+    """Time the enclosed block as one span of the trace."""
+
+    if not ENABLED:
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        _spans.append((name, start, perf_counter() - start, get_ident(), args))
+
+
+def summary() -> list[tuple[str, int, float, float]]:
+    """(stage, count, average ms, max ms) of every stage so far, slowest in total first."""
+
+    stages = {}
+    for name, _, duration, _, _ in list(_spans):
+        count, total, longest = stages.get(name, (0, 0.0, 0.0))
+        stages[name] = (count + 1, total + duration, max(longest, duration))
+
+    rows = [
+        (name, count, total / count * 1000, longest * 1000)
+        for name, (count, total, longest) in stages.items()
+    ]
+    return sorted(rows, key=lambda row: row[1] * row[2], reverse=True)
+
+
+def export(file_name: str = TRACE_FILE):
+    """Write every span in the Trace Event format, viewable in chrome://tracing or Perfetto."""
+
+    if not file_name:
+        return
+
+    pid = getpid()
+    events = [
+        {
+            "name": name,
+            "cat": name.split(".")[0],
+            "ph": "X",
+            "ts": (start - _origin) * 1e6,
+            "dur": duration * 1e6,
+            "pid": pid,
+            "tid": thread,
+            "args": args,
+        }
+        for name, start, duration, thread, args in list(_spans)
+    ]
+
+    if directory := path.dirname(file_name):
+        makedirs(directory, exist_ok=True)
+    with open(file_name, "w", encoding="utf8") as file:
+        dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
@@ -1,20 +1,32 @@
 """General purpose utilities and helpers for smooth game operation."""
 
+from __future__ import annotations
+
 from dataclasses import dataclass
 from types import FunctionType
-from time import sleep
-from urllib.request import urlretrieve
 from re import sub
-from datetime import date
-from os import mkdir, remove, path
+from os import path
 from random import randint
 from threading import Thread
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from queue import Queue
-from array import array
-from tkinter import IntVar
-from tkinter.ttk import Label
+from typing import TYPE_CHECKING
+
+from hammerpy.trace import span
+
+if TYPE_CHECKING:
+    # only annotations need them, so the harvest runs without Tk installed
+    from tkinter import IntVar
+    from tkinter.ttk import Label
+
+    from PIL import ImageTk
+
+# max number of images downloaded at the same time
+DOWNLOAD_WORKERS = 4
+
+# where data that outlives a game session (rates, pages, ...) is kept
+CACHE_DIR = "hammerpy/cache"
 
-from PIL import ImageTk
 
 @dataclass
 class Artwork:
@@ -25,22 +37,35 @@ class Artwork:
     prices: list[int]
 
 
+@dataclass
+class ScrapeStats:
+    """Counters of what a scraper got done, e.g. for throughput reports."""
+
+    works: int = 0  # works handed on
+    cached: int = 0  # works whose image was already on disk, so cost no download
+    failed: int = 0  # images that turned out to be unavailable
+    bytes: int = 0  # size of the downloaded images
+
+
 @dataclass
 class Guesswork:
-    """Represents an Artwork instance with additional guessing-related metrics."""
+    """Represents an Artwork instance with additional guessing-related metrics.
+
+    Its images are only created while they are on screen, see HammerPy._when_prepared.
+    """
 
     art: Artwork
     path: str
-    disp_img: ImageTk.PhotoImage
     disp_width: int
     disp_height: int
-    review_img: ImageTk.PhotoImage
     review_width: int
     review_height: int
     lower_bound: int
     upper_bound: int
     _keep: IntVar
     _guess: int = 0
+    disp_img: ImageTk.PhotoImage | None = None
+    review_img: ImageTk.PhotoImage | None = None
 
     @property
     def keep(self):
@@ -64,7 +89,11 @@ class Guesswork:
 
 
 class Scraper(Thread):
-    """Handles collection of artwork."""
+    """Handles collection of artwork.
+
+    Images go to the shared image cache, and every work handed on holds its
+    image there until the consumer releases it.
+    """
 
     def __init__(
         self,
@@ -73,6 +102,8 @@ class Scraper(Thread):
         src_type: int,
         slug: str,
         scrape_fn: FunctionType,
+        workers: int = DOWNLOAD_WORKERS,
+        catalog=None,
     ):
         super().__init__()
         self._running = (
@@ -87,50 +118,126 @@ class Scraper(Thread):
         self._limit = limit  # how many artworks to scrape
         self._scrape = scrape_fn  # source to scrape
         self._slug = slug  # filter that user wants to apply to results
-        self.driver = None
-
-        # Does the Sotheby's page max binary file exist? If not, then create it
-        if src_type and not path.isfile("hammerpy/sothpmax"):
-            with open("hammerpy/sothpmax", "wb+") as file:
-                pmax_arr = array("B", [0] * 11)
-                pmax_arr.tofile(file)
+        self._workers = workers  # how many images can be downloaded at once
+        self._catalog = catalog  # if given, every downloaded work is recorded in it
+        self._src = src_type
+        self.stats = ScrapeStats()
 
     def stop(self):
         """Stop the scraping preocedure."""
 
         self._running = False
 
+    def _download(self, work: Artwork) -> tuple[tuple[Artwork, str], int] | None:
+        """Worker task: get one image, from disk if it was seen before.
+
+        Returns the work with its image and how many bytes were downloaded,
+        or None if the image is unavailable.
+        """
+
+        # imported here since the image cache builds on this module
+        from hammerpy.imagecache import image_cache
+
+        size = 0
+        save_path = image_cache.lookup(work.image_url, hold=True)
+        if not save_path:
+            # one streamed GET both validates the image and saves it, if
+            # it's unavailable we just scrape a replacement later
+            with span("scraper.download"):
+                save_path = image_cache.download(work.image_url, hold=True)
+            if not save_path:
+                return None
+            size = path.getsize(save_path)
+
+        if self._catalog:
+            self._catalog.add(self._src, self._slug, work, save_path)
+        return ((work, save_path), size)
+
+    @staticmethod
+    def _release_download(future: Future):
+        """Let go of the image of a download nobody waits for anymore."""
+
+        # imported here since the image cache builds on this module
+        from hammerpy.imagecache import image_cache
+
+        if not future.cancelled() and not future.exception() and future.result():
+            (_, save_path), _ = future.result()
+            image_cache.release(save_path)
+
     def run(self):
         """Run the scraping preocedure."""
 
+        # imported here since the image cache builds on this module
+        from hammerpy.imagecache import image_cache
+
         count = 0
-        works = []
-
-        # neatly organize images into folders per day for different "sessions"
-        today_date = date.today()
-        if not path.isdir(f"img/{today_date}"):
-            mkdir(f"img/{today_date}")
-
-        while self._running and count < self._limit:
-            amount = randint(1, self._limit - count)
-            print(f"Amount: {amount}")
-            works, no_more = self._scrape(self._slug, amount)
-
-            for work in works:
-                final_title = cleanse(work.title)
-                save_path = f"img/{today_date}/{final_title}.jpg"
-                urlretrieve(work.image_url, save_path)
-                print(f"Downloaded {count + 1}/{self._limit}")
-
-                count += 1
-                self._q.put_nowait((work, save_path))
-                if count == 5:
-                    sleep(5)
-
-                if no_more:
+        in_flight = set()
+        exhausted = False
+
+        # politeness is handled by the per-host rate limiter in hammerpy.net,
+        # so downloads can run concurrently instead of one after the other
+        pool = ThreadPoolExecutor(max_workers=self._workers)
+        try:
+            while self._running and count < self._limit:
+                # only scrape more while the downloads in flight can't fill the quota
+                wanted = self._limit - count - len(in_flight)
+                if wanted > 0 and not exhausted:
+                    amount = randint(1, wanted)
+                    print(f"Amount: {amount}")
+                    with span("scraper.scrape", amount=amount):
+                        works, exhausted = self._scrape(
+                            self._slug, amount, validate=False
+                        )
+
+                    for work in works[:wanted]:
+                        in_flight.add(pool.submit(self._download, work))
+                    wanted -= len(works)
+                elif not in_flight:
                     break
 
-        self._q.put_nowait(None)
+                if not in_flight:
+                    continue
+
+                # don't block on downloads while there's still scraping to do
+                done, in_flight = wait(
+                    in_flight,
+                    timeout=0 if wanted > 0 and not exhausted else None,
+                    return_when=FIRST_COMPLETED,
+                )
+
+                # push works in the order their downloads complete
+                for future in done:
+                    try:
+                        result = future.result()
+                    except Exception as err:  # pylint: disable=broad-except
+                        # one broken download mustn't end the whole scrape
+                        print(f"Download failed: {err}")
+                        result = None
+                    if not result:
+                        self.stats.failed += 1
+                        continue
+
+                    item, size = result
+                    if not self._running or count == self._limit:
+                        image_cache.release(item[1])
+                        continue
+
+                    count += 1
+                    self.stats.works = count
+                    self.stats.cached += not size
+                    self.stats.bytes += size
+                    print(f"Downloaded {count}/{self._limit}")
+                    self._q.put_nowait(item)
+        finally:
+            # downloads that are dropped still hold their image once they finish
+            for future in in_flight:
+                future.add_done_callback(self._release_download)
+            pool.shutdown(wait=False, cancel_futures=True)
+            # e.g. a mixed scrape still has scrapes of its own in flight
+            if close := getattr(self._scrape, "close", None):
+                close()
+            # the consumer waits for this, even if scraping failed part way
+            self._q.put_nowait(None)
 
 
 def switch_desc(diff_desc: Label, descs: list[str], diff_int: int):
@@ -150,11 +257,3 @@ def cleanse(sins):
     """Remove troublesome characters to prepare for string parsing."""
 
     return sub("[?:/\"'\t\n\r!@#$%&<>{}|=+`]", "", sins)
-
-
-def remove_works(works: list[Guesswork]):
-    """Purge list of all Guessworks for the current session."""
-
-    for w in works:
-        if not w.keep.get() and path.isfile(w.path):
-            remove(w.path)